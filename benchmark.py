@@ -0,0 +1,295 @@
+"""Benchmark the storage and Dashboard paths on synthetic reminders.
+
+Run ``python benchmark.py --sizes 1000,100000 --backends csv,sqlite``. For
+each backend and size a fresh store is filled with generated reminders in a
+temporary directory, then every operation is timed ``--repeat`` times and
+reported as p50/p95 milliseconds plus the peak memory allocated by one
+extra run (as traced by ``tracemalloc``, so memory held by SQLite or Arrow
+outside Python's allocator is not counted):
+
+``load``
+    ``load()`` on a freshly opened store, as after another process wrote.
+``save``
+    ``save()`` of one new reminder (including the Dashboard index update).
+``update``
+    ``update_status()`` of one random reminder (likewise).
+``index_build``
+    The first Dashboard query through a new ``IndexedStore`` (a full load
+    plus index build).
+``dashboard``
+    One Dashboard rerun from the built index: the listed count, the first
+    page and the Summary counts.
+
+Write-behind batching is left out, so ``save`` and ``update`` are the
+latency of a real write.
+
+``--parse N`` also times the Gemini parse pipeline on ``N`` generated
+inputs against ``mock_gemini.MockGeminiModel`` (configured by its
+``NEVERMISS_MOCK_*`` variables), with the parse cache in the temporary
+directory and the rate limit set by ``--rpm``:
+
+``parse_one``
+    ``parse_with_gemini`` of one input, bypassing the cache.
+``parse_cached``
+    ``parse_with_gemini`` of an input already in the cache.
+``parse_concurrent``
+    ``parse_concurrently`` of all inputs, one request each, from an empty
+    cache.
+``parse_batch``
+    ``parse_batch_with_gemini`` of all inputs, bypassing the cache.
+
+Nothing here imports Streamlit or touches the network. ``--json`` appends
+one JSON line per result, for comparing runs.
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import storage
+
+DEFAULT_SIZES = "1000,10000,100000"
+PAGE_SIZE = 25
+
+PEOPLE = ["Sam", "Priya", "Mom", "Dr. Lee", "Alex", "Jordan", "the landlord", "Maria", "Chen", "the recruiter"]
+TOPICS = ["the contract", "Q3 budget", "the offer", "insurance", "the lease", "taxes", "the roadmap",
+          "car repair", "school forms", "the invoice"]
+TEMPLATES = {
+    "appointment": ["Dentist appointment", "Doctor visit with {person}", "Haircut", "Parent-teacher meeting",
+                    "Meeting with {person} about {topic}"],
+    "task": ["Pay {topic}", "Buy groceries", "Renew passport", "Water plants", "Submit {topic}",
+             "Book flights", "Clean the garage"],
+    "opportunity": ["Apply for the {topic} grant", "Pitch {person} on {topic}", "Sign up for the conference",
+                    "Look into {topic} discount"],
+    "follow-up": ["Follow up with {person} re {topic}", "Call {person} back", "Email {person} about {topic}",
+                  "Check in with {person}"],
+}
+NOTE_WORDS = ("bring documents confirm address ask about pricing reschedule if needed remember parking "
+              "send summary afterwards check calendar before call print copies").split()
+RECURRENCES = ["FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO", "FREQ=WEEKLY;BYDAY=MO,TH", "FREQ=MONTHLY;BYMONTHDAY=1",
+               "FREQ=WEEKLY;INTERVAL=2"]
+OPERATIONS = ["load", "save", "update", "index_build", "dashboard"]
+PARSE_OPERATIONS = ["parse_one", "parse_cached", "parse_concurrent", "parse_batch"]
+
+
+def generate_reminder(rng, today):
+    """Return one random reminder dict in the shape the app saves."""
+    category = rng.choice(storage.CATEGORIES)
+    title = rng.choice(TEMPLATES[category]).format(person=rng.choice(PEOPLE), topic=rng.choice(TOPICS))
+    day = today + timedelta(days=rng.randint(-180, 365)) if rng.random() < 0.9 else None
+    clock = f"{rng.randint(7, 20):02d}:{rng.choice(['00', '15', '30', '45'])}" if rng.random() < 0.5 else None
+    # Most past reminders are done; most upcoming ones are not.
+    done = rng.random() < (0.8 if day is not None and day < today else 0.1)
+    notes = " ".join(rng.choices(NOTE_WORDS, k=rng.randint(3, 40))) if rng.random() < 0.3 else None
+    when = " ".join(filter(None, [day.strftime("%b %d") if day else None, clock]))
+    created = datetime.combine(today, datetime.min.time()) - timedelta(minutes=rng.randint(0, 400 * 24 * 60))
+    return {
+        "raw_input": f"{title.lower()} {when}".strip(),
+        "title": title,
+        "category": category,
+        "date": day.isoformat() if day else None,
+        "time": clock,
+        "recurrence": rng.choice(RECURRENCES) if day is not None and rng.random() < 0.02 else None,
+        "priority": rng.choice(storage.PRIORITIES),
+        "notes": notes,
+        "status": "completed" if done else "pending",
+        "created_at": created.isoformat(),
+    }
+
+
+def generate_reminders(count, seed=0, today=None):
+    """Return ``count`` random reminders, the same ones for the same ``seed`` and ``today``."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    return [generate_reminder(rng, today) for _ in range(count)]
+
+
+def open_store(backend, directory):
+    """Open the raw ``backend`` store with its files under ``directory``."""
+    directory = Path(directory)
+    if backend == "csv":
+        return storage.CSVStore(directory / "reminders.csv")
+    if backend == "sqlite":
+        return storage.SQLiteStore(directory / "reminders.db", import_csv=None)
+    if backend == "eventlog":
+        return storage.EventLogStore(directory / "reminders.log")
+    if backend == "parquet":
+        return storage.ParquetStore(directory / "reminders_parquet")
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+def percentile(samples, fraction):
+    """Return the nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(operation, repeat):
+    """Time ``operation()`` ``repeat`` times, then trace one more call for its peak memory."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "peak_mib": peak / 2**20,
+    }
+
+
+def bench_backend(backend, size, repeat, seed=0, today=None):
+    """Fill a fresh ``backend`` store with ``size`` reminders and measure each operation."""
+    today = today or date.today()
+    rng = random.Random(seed + 1)
+    with tempfile.TemporaryDirectory(prefix="nevermiss-bench-") as directory:
+        store = open_store(backend, directory)
+        started = time.perf_counter()
+        store.save_many(generate_reminders(size, seed, today))
+        results = [{"operation": "seed", "p50_ms": (time.perf_counter() - started) * 1000}]
+
+        # Writes go through the index, as in the app, so it stays current.
+        indexed = storage.IndexedStore(store, path=None)
+        indexed.count()
+
+        def update():
+            indexed.update_status(rng.randint(1, size), rng.choice(storage.STATUSES))
+
+        def index_build():
+            rebuilt = storage.IndexedStore(store, path=None)
+            rebuilt.count()
+            rebuilt.close()
+
+        def dashboard_rerun():
+            total = indexed.count(today=today)
+            indexed.page(offset=0, limit=PAGE_SIZE, today=today)
+            indexed.summary(today)
+            return total
+
+        operations = {
+            "load": lambda: open_store(backend, directory).load(),
+            "save": lambda: indexed.save(generate_reminder(rng, today)),
+            "update": update,
+            "index_build": index_build,
+            "dashboard": dashboard_rerun,
+        }
+        for name in OPERATIONS:
+            results.append(dict(measure(operations[name], repeat), operation=name))
+        indexed.close()
+    return [dict(result, backend=backend, rows=size) for result in results]
+
+
+def bench_parsing(count, repeat, rpm=0, seed=0, today=None):
+    """Measure the parse pipeline on ``count`` generated inputs against the mock model."""
+    import mock_gemini
+    import parse_cache
+    import parsing
+
+    today = today or date.today()
+    rng = random.Random(seed + 1)
+    texts = [reminder["raw_input"] for reminder in generate_reminders(count, seed, today)]
+    model = mock_gemini.MockGeminiModel(seed=seed)
+    rate_limiter = parsing.rate_limiter
+    with tempfile.TemporaryDirectory(prefix="nevermiss-bench-") as directory:
+        cache = parse_cache.ParseCache(Path(directory) / "parse_cache.db")
+        parsing.set_model(model)
+        parse_cache.set_cache(cache)
+        parsing.rate_limiter = parsing.TokenBucket(rpm / 60, capacity=max(1, parsing.GEMINI_CONCURRENCY))
+        try:
+            def parse_one():
+                try:
+                    parsing.parse_with_gemini(rng.choice(texts), today, use_cache=False)
+                except Exception:  # failures are counted by the model
+                    pass
+
+            def parse_concurrent():
+                cache.clear()
+                parsing.parse_concurrently(texts, today)
+
+            def parse_batch():
+                try:
+                    parsing.parse_batch_with_gemini(texts, today, use_cache=False)
+                except Exception:
+                    pass
+
+            operations = {
+                "parse_one": parse_one,
+                "parse_concurrent": parse_concurrent,
+                "parse_batch": parse_batch,
+                "parse_cached": lambda: parsing.parse_with_gemini(texts[0], today),
+            }
+            results = []
+            # For parse_cached.
+            cache.put(texts[0], today, model.respond(texts[0], today), parsing.cache_namespace(model))
+            for name in PARSE_OPERATIONS:
+                calls, errors = model.calls, model.errors
+                result = dict(measure(operations[name], repeat), operation=name)
+                result["calls"] = model.calls - calls
+                result["errors"] = model.errors - errors
+                results.append(result)
+        finally:
+            parsing.set_model(None)
+            parse_cache.set_cache(None)
+            parsing.rate_limiter = rate_limiter
+    return [dict(result, backend="mock", rows=count) for result in results]
+
+
+def format_row(result):
+    p95 = result.get("p95_ms")
+    peak = result.get("peak_mib")
+    return (f"{result['backend']:<9} {result['rows']:>9,} {result['operation']:<16} "
+            f"{result['p50_ms']:>10.2f} {'' if p95 is None else f'{p95:.2f}':>10} "
+            f"{'' if peak is None else f'{peak:.1f}':>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated row counts (default: %(default)s)")
+    parser.add_argument("--backends", default=",".join(storage.BACKENDS),
+                        help="comma-separated storage backends (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the generated data")
+    parser.add_argument("--parse", type=int, default=0, metavar="N",
+                        help="also time parsing N inputs with the mock Gemini model")
+    parser.add_argument("--rpm", type=float, default=0,
+                        help="requests per minute allowed to the mock model, 0 for no limit (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="append results as JSON lines to PATH")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    runs = [(bench_backend, backend, size) for backend in backends for size in sizes]
+    if args.parse:
+        runs.append((lambda _, size, repeat, seed: bench_parsing(size, repeat, args.rpm, seed), "mock", args.parse))
+    print(f"{'backend':<9} {'rows':>9} {'operation':<16} {'p50 ms':>10} {'p95 ms':>10} {'peak MiB':>9}")
+    for bench, backend, size in runs:
+        try:
+            results = bench(backend, size, args.repeat, args.seed)
+        except RuntimeError as e:  # e.g. pyarrow missing for parquet
+            print(f"{backend:<9} {size:>9,} skipped: {e}")
+            continue
+        for result in results:
+            print(format_row(result))
+        if args.json:
+            started_at = datetime.now().isoformat(timespec="seconds")
+            with open(args.json, "a") as handle:
+                for result in results:
+                    handle.write(json.dumps(dict(result, repeat=args.repeat, started_at=started_at)) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Near-duplicate detection for reminder text with MinHash and LSH.
+
+Each text is reduced to its set of words (1-word shingles; character
+shingles would make "call Sam" and "call Samir" near-identical) and
+summarized by a MinHash signature, whose positions agree between two texts
+with probability equal to the Jaccard similarity of their word sets. The
+signatures are cut into bands and every band is hashed into a bucket, so
+texts that are likely similar share at least one bucket. Looking a text up
+only touches its own buckets (a binary search per band), which keeps the
+check sub-linear in the number of reminders; candidates are then confirmed
+with the exact Jaccard similarity.
+"""
+import os
+import re
+import zlib
+
+import numpy as np
+
+DUPLICATE_THRESHOLD = float(os.getenv("NEVERMISS_DUPLICATE_THRESHOLD", 0.7))
+
+NUM_PERM = 60
+# 15 bands of 4 rows put the detection curve's midpoint near a similarity
+# of 0.5, so pairs at 0.7 are found about 98% of the time.
+BANDS = 15
+ROWS = NUM_PERM // BANDS
+
+# Hash functions (a * x + b) mod p over 32-bit shingle hashes. p is the
+# smallest prime above 2**32, which keeps a * x + b within 64 bits.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint64)
+# Multipliers folding a band's rows into one bucket hash.
+_BAND_MIX = _rng.integers(1, 2**63, ROWS, dtype=np.uint64) | np.uint64(1)
+# Signatures for this many shingles are computed per numpy call.
+_CHUNK = 200000
+
+
+def shingles(text):
+    """Return the set of lower-case words in ``text``."""
+    if text is None or text != text:  # None or NaN
+        return set()
+    return set(re.findall(r"[^\W_]+", str(text).lower()))
+
+
+def jaccard(first, second):
+    """Return the Jaccard similarity of two shingle sets."""
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def signatures(shingle_sets):
+    """Return one MinHash signature row per non-empty shingle set."""
+    hashes, lengths = [], []
+    for shingle_set in shingle_sets:
+        hashes.extend(zlib.crc32(shingle.encode()) for shingle in shingle_set)
+        lengths.append(len(shingle_set))
+    hashes = np.array(hashes, dtype=np.uint64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    result = np.empty((len(lengths), NUM_PERM), dtype=np.uint64)
+    # Hash in chunks of whole sets, so memory stays bounded on big rebuilds.
+    first = 0
+    while first < len(lengths):
+        last = np.searchsorted(starts, starts[first] + _CHUNK, side="right")
+        last = max(last, first + 1)
+        stop = starts[last] if last < len(lengths) else len(hashes)
+        values = (hashes[starts[first]:stop, None] * _A + _B) % _PRIME
+        result[first:last] = np.minimum.reduceat(values, starts[first:last] - starts[first])
+        first = last
+    return result
+
+
+def band_hashes(signatures):
+    """Return each signature's bucket hash per band, shape ``(rows, BANDS)``."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS)
+    with np.errstate(over="ignore"):
+        # Wrapping uint64 arithmetic is the point here.
+        return (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64)
+
+
+class DuplicateIndex:
+    """LSH buckets of MinHash signatures, keyed by caller-chosen integer keys.
+
+    A key can be added under several texts (say, a title and the original
+    input); it is then a candidate whenever any of them is similar. Keys
+    added in bulk are kept in sorted numpy arrays per band, a few at a time
+    in a dict per band. The band hashes of texts added in bulk are kept, one
+    row per distinct text, so an index built to replace this one can take
+    them over and only hash texts it has not seen before.
+    """
+
+    def __init__(self):
+        self.hashes = np.empty((0, BANDS), dtype=np.uint64)
+        self.keys = np.empty((0, BANDS), dtype=np.int32)
+        self.recent = [{} for _ in range(BANDS)]
+        # Row of each text in text_hashes, or -1 for texts without words.
+        self.text_rows = {}
+        self.text_hashes = np.empty((0, BANDS), dtype=np.uint64)
+
+    def _text_hash_rows(self, texts, reuse):
+        """Return the ``text_hashes`` row of each text, hashing only unseen ones."""
+        reused, new = [], []
+        for text in dict.fromkeys(texts):
+            if text in self.text_rows:
+                continue
+            row = reuse.text_rows.get(text) if reuse is not None else None
+            if row is None:
+                new.append(text)
+            elif row < 0:
+                self.text_rows[text] = -1
+            else:
+                reused.append(text)
+        parts = [self.text_hashes]
+        if reused:
+            parts.append(reuse.text_hashes[[reuse.text_rows[text] for text in reused]])
+        shingle_sets = [shingles(text) for text in new]
+        worded = [text for text, shingle_set in zip(new, shingle_sets) if shingle_set]
+        if worded:
+            parts.append(band_hashes(signatures([shingle_set for shingle_set in shingle_sets if shingle_set])))
+        start = len(self.text_hashes)
+        self.text_hashes = np.concatenate(parts)
+        self.text_rows.update((text, start + offset) for offset, text in enumerate(reused + worded))
+        self.text_rows.update((text, -1) for text, shingle_set in zip(new, shingle_sets) if not shingle_set)
+        return np.array([self.text_rows[text] for text in texts], dtype=np.int64)
+
+    def add_many(self, keys, texts, reuse=None):
+        """Index each key under the matching text; texts without words are skipped.
+
+        ``reuse`` is an index being replaced, whose hashes of the same texts
+        are taken over instead of computed again.
+        """
+        pairs = [(key, str(text)) for key, text in zip(keys, texts) if text is not None and text == text]
+        if len(pairs) <= 8:
+            for key, text in pairs:
+                shingle_set = shingles(text)
+                if shingle_set:
+                    buckets = band_hashes(signatures([shingle_set]))[0]
+                    for recent, bucket in zip(self.recent, buckets.tolist()):
+                        recent.setdefault(bucket, []).append(key)
+            return
+        rows = self._text_hash_rows([text for _, text in pairs], reuse)
+        worded = rows >= 0
+        keys = np.array([key for key, _ in pairs], dtype=np.int32)[worded]
+        hashes = np.concatenate([self.hashes, self.text_hashes[rows[worded]]])
+        keys = np.concatenate([self.keys, np.repeat(keys[:, None], BANDS, axis=1)])
+        order = np.argsort(hashes, axis=0)
+        self.hashes = np.take_along_axis(hashes, order, axis=0)
+        self.keys = np.take_along_axis(keys, order, axis=0)
+
+    def candidates(self, shingle_set):
+        """Return the keys sharing at least one bucket with ``shingle_set``."""
+        if not shingle_set:
+            return set()
+        found = set()
+        buckets = band_hashes(signatures([shingle_set]))[0]
+        for band, bucket in enumerate(buckets):
+            column = self.hashes[:, band]
+            start = np.searchsorted(column, bucket, side="left")
+            stop = np.searchsorted(column, bucket, side="right")
+            found.update(self.keys[start:stop, band].tolist())
+            found.update(self.recent[band].get(int(bucket), ()))
+        return found
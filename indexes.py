@@ -0,0 +1,445 @@
+"""In-memory secondary indexes over reminders.
+
+``ReminderIndex`` keeps every reminder record plus date-ordered entry lists
+per status and per category, updated incrementally on insert and status
+change. The Dashboard's queries ("the next 50 pending reminders by date",
+"how many are pending") are then answered with bisection and slicing
+instead of scanning and sorting the whole table. Recurring reminders are
+expanded lazily into their occurrences up to the end of the window being
+listed and merged into the date order. Summary counts are kept
+as counters, with the overdue count rolled forward day by day from
+per-date buckets of pending reminders.
+
+The same index holds an inverted index over the reminders' text, so
+keyword searches are answered from posting lists and ranked with BM25, and
+an LSH index of title and input shingles for spotting near-duplicate
+reminders.
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import date, timedelta
+from itertools import islice
+
+import recurrence
+from duplicates import DuplicateIndex, jaccard, shingles
+
+# Sorts after every ISO date, so undated reminders come last.
+UNDATED = "~"
+
+# Searchable fields and how much a word in each counts towards the rank.
+SEARCH_FIELDS = {"title": 2, "notes": 1, "raw_input": 1}
+# The last word of a query also matches longer words, so results show up
+# while typing; only the most common expansions are searched.
+PREFIX_MIN_LENGTH = 2
+PREFIX_EXPANSIONS = 50
+# Queries matching more records than this rank only the newest of them.
+SEARCH_SCORED = 2000
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Texts compared when looking for near-duplicate reminders.
+DUPLICATE_FIELDS = ("title", "raw_input")
+
+TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """Split ``text`` into lower-case words."""
+    if text is None or text != text:  # None or NaN
+        return []
+    return TOKEN.findall(str(text).lower())
+
+
+def date_key(value):
+    """Return the sort key for a record's ``date`` value."""
+    if value is None or value != value:  # None or NaN
+        return UNDATED
+    return str(value)[:10]
+
+
+def _occurrence_entries(rule, start, last, key):
+    # A rule with no occurrence in the window (say an UNTIL before the
+    # reminder's date) still lists the reminder once, like an invalid rule.
+    listed = False
+    for day in recurrence.occurrences_between(rule, start, start, last):
+        listed = True
+        yield day.isoformat(), key
+    if not listed:
+        yield date_key(start), key
+
+
+class ReminderIndex:
+    """Date-ordered indexes of reminder records by status and by category.
+
+    Records are plain dicts as returned by ``storage.to_records``. Each one
+    gets an internal key in insertion order, which breaks ties between
+    reminders on the same date and keeps rows that share a reminder ID
+    apart.
+    """
+
+    # Bumped whenever the attributes change, so stale pickles are rebuilt.
+    FORMAT = 7
+
+    def __init__(self):
+        self.rows = {}
+        self.keys_by_id = {}
+        self.by_status = {}
+        self.by_category = {}
+        self.status_keys = {}
+        self.category_keys = {}
+        self.counts = Counter()
+        self.status_counts = Counter()
+        self.pending_by_day = Counter()
+        self._overdue = 0
+        self._overdue_day = None
+        self.postings = {}
+        self.vocabulary = []
+        self.doc_lengths = {}
+        self.total_length = 0
+        self._generation = 0
+        self._last_search = None
+        self.duplicates = DuplicateIndex()
+        self.recurring = {}
+        self._next_key = 0
+
+    @classmethod
+    def build(cls, records, previous=None):
+        """Return an index of ``records``.
+
+        The LSH hashes of texts already indexed by ``previous``, the index
+        being replaced, are reused rather than computed again.
+        """
+        index = cls()
+        for key, record in enumerate(records):
+            index.rows[key] = record
+            index.keys_by_id.setdefault(record["reminder_id"], []).append(key)
+            entry = (date_key(record["date"]), key)
+            index.by_status.setdefault(record["status"], []).append(entry)
+            index.by_category.setdefault(record["category"], []).append(entry)
+            index.status_keys.setdefault(record["status"], set()).add(key)
+            index.category_keys.setdefault(record["category"], set()).add(key)
+            index._count(record, record["status"], 1)
+            index._index_text(key, record)
+            index._track_recurrence(key, record)
+        index._next_key = len(index.rows)
+        # One sort per list instead of an insort per record.
+        for entries in [*index.by_status.values(), *index.by_category.values()]:
+            entries.sort()
+        index.vocabulary = sorted(index.postings)
+        keys = list(index.rows)
+        index.duplicates.add_many(
+            keys * len(DUPLICATE_FIELDS),
+            [index.rows[key].get(field) for field in DUPLICATE_FIELDS for key in keys],
+            reuse=previous.duplicates if previous is not None else None,
+        )
+        return index
+
+    def __len__(self):
+        return len(self.rows)
+
+    def insert(self, record):
+        key = self._next_key
+        self._next_key += 1
+        self.rows[key] = record
+        self.keys_by_id.setdefault(record["reminder_id"], []).append(key)
+        entry = (date_key(record["date"]), key)
+        insort(self.by_status.setdefault(record["status"], []), entry)
+        insort(self.by_category.setdefault(record["category"], []), entry)
+        self.status_keys.setdefault(record["status"], set()).add(key)
+        self.category_keys.setdefault(record["category"], set()).add(key)
+        self._count(record, record["status"], 1)
+        self._track_recurrence(key, record)
+        for term in self._index_text(key, record):
+            insort(self.vocabulary, term)
+        self.duplicates.add_many([key] * len(DUPLICATE_FIELDS), [record.get(field) for field in DUPLICATE_FIELDS])
+        self._generation += 1
+
+    def set_status(self, reminder_id, status):
+        for key in self.keys_by_id.get(reminder_id, []):
+            record = self.rows[key]
+            old = record["status"]
+            if old == status:
+                continue
+            entry = (date_key(record["date"]), key)
+            entries = self.by_status[old]
+            del entries[bisect_left(entries, entry)]
+            insort(self.by_status.setdefault(status, []), entry)
+            self.status_keys[old].discard(key)
+            self.status_keys.setdefault(status, set()).add(key)
+            self._count(record, old, -1)
+            self._count(record, status, 1)
+            record["status"] = status
+            self._generation += 1
+
+    def set_date(self, reminder_id, day):
+        """Move a reminder to ISO ``day``, as when a recurring one moves on to its next occurrence."""
+        for key in self.keys_by_id.get(reminder_id, []):
+            record = self.rows[key]
+            old = (date_key(record["date"]), key)
+            for entries in (self.by_status[record["status"]], self.by_category[record["category"]]):
+                del entries[bisect_left(entries, old)]
+            self._count(record, record["status"], -1)
+            record["date"] = day
+            new = (date_key(day), key)
+            insort(self.by_status[record["status"]], new)
+            insort(self.by_category[record["category"]], new)
+            self._count(record, record["status"], 1)
+            self._generation += 1
+
+    def _track_recurrence(self, key, record):
+        if not record.get("recurrence"):
+            return
+        try:
+            self.recurring[key] = recurrence.parse_rule(record["recurrence"])
+        except ValueError:
+            pass  # listed as a one-off reminder
+
+    def _count(self, record, status, delta):
+        self.counts[status, record["category"]] += delta
+        self.status_counts[status] += delta
+        day = date_key(record["date"])
+        if status == "pending" and day != UNDATED:
+            self.pending_by_day[day] += delta
+            if self._overdue_day is not None and day < self._overdue_day:
+                self._overdue += delta
+
+    def _index_text(self, key, record):
+        """Add ``record``'s words to the posting lists and return the new terms."""
+        weights = Counter()
+        for field, weight in SEARCH_FIELDS.items():
+            for term in tokenize(record.get(field)):
+                weights[term] += weight
+        new_terms = []
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                new_terms.append(term)
+            postings[key] = weight
+        length = sum(weights.values())
+        self.doc_lengths[key] = length
+        self.total_length += length
+        return new_terms
+
+    def _expand(self, prefix):
+        """Return the most common indexed words starting with ``prefix``."""
+        start = bisect_left(self.vocabulary, prefix)
+        stop = bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        terms = self.vocabulary[start:stop]
+        if len(terms) > PREFIX_EXPANSIONS:
+            terms = heapq.nlargest(PREFIX_EXPANSIONS, terms, key=lambda term: len(self.postings[term]))
+        return terms
+
+    def search(self, query, status=None, category=None, limit=None):
+        """Return the keys of records matching every word of ``query``, best first.
+
+        Each word must appear in the title, notes or original input; the
+        last word also matches as a prefix. Matches are ranked by BM25 over
+        the weighted fields, newest first among equal scores. A query
+        matching more than ``SEARCH_SCORED`` records ranks the newest of
+        them and lists the older ones after, newest first. Only the top
+        ``limit`` are ranked when given.
+        """
+        matches, scores = self._search(query, status, category)
+        rank = lambda key: (scores[key], key)
+        if limit is None:
+            ranked = sorted(scores, key=rank, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores, key=rank)
+        if len(matches) > len(scores) and (limit is None or limit > len(ranked)):
+            older = sorted(matches.difference(scores), reverse=True)
+            ranked.extend(older if limit is None else older[:limit - len(ranked)])
+        return ranked
+
+    def count_matches(self, query, status=None, category=None):
+        """Return how many records ``search`` would return."""
+        return len(self._search(query, status, category)[0])
+
+    def _search(self, query, status, category):
+        """Return the keys of the records matching ``query`` and ``{key: score}`` for those ranked.
+
+        The last result is remembered until the index changes, so counting
+        and paging the same search doesn't score it twice.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return set(), {}
+        memo = (tuple(terms), status, category, self._generation)
+        if self._last_search is not None and self._last_search[0] == memo:
+            return self._last_search[1]
+
+        groups = [[term] if term in self.postings else [] for term in terms[:-1]]
+        last = terms[-1]
+        if len(last) >= PREFIX_MIN_LENGTH:
+            groups.append(self._expand(last))
+        else:
+            groups.append([last] if last in self.postings else [])
+        # Rarest words first, so the candidate set shrinks as fast as possible.
+        groups.sort(key=lambda group: sum(len(self.postings[term]) for term in group))
+
+        # Matching is set arithmetic on the posting lists' keys; only
+        # scoring walks the matches in Python.
+        matches = None
+        for group in groups:
+            if matches is None:
+                matches = set().union(*(self.postings[term].keys() for term in group))
+            else:
+                matches = set().union(*(self.postings[term].keys() & matches for term in group))
+            if not matches:
+                break
+        if matches and status is not None:
+            matches &= self.status_keys.get(status, set())
+        if matches and category is not None:
+            matches &= self.category_keys.get(category, set())
+
+        scored = matches
+        if len(matches) > SEARCH_SCORED:
+            # Keys grow with insertion, so these are the newest matches.
+            scored = set(sorted(matches)[-SEARCH_SCORED:])
+        count = len(self.rows)
+        lengths = self.doc_lengths
+        # BM25 length normalization is base + scale * document length.
+        base = BM25_K1 * (1 - BM25_B)
+        scale = BM25_K1 * BM25_B * count / self.total_length if self.total_length else 0
+        scores = dict.fromkeys(scored, 0)
+        for group in groups if scored else []:
+            group_scores = {}
+            for term in group:
+                postings = self.postings[term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                weight = idf * (BM25_K1 + 1)
+                for key in postings.keys() & scored:
+                    frequency = postings[key]
+                    score = weight * frequency / (frequency + base + scale * lengths[key])
+                    # A prefix group counts its best-matching word only.
+                    if score > group_scores.get(key, 0):
+                        group_scores[key] = score
+            for key, score in group_scores.items():
+                scores[key] += score
+
+        self._last_search = (memo, (matches, scores))
+        return matches, scores
+
+    def find_duplicates(self, record, threshold, status="pending"):
+        """Return ``(similarity, key)`` for reminders similar to ``record``, most similar first.
+
+        ``record``'s title and original input are compared with those of
+        every LSH candidate in ``status`` (None for any); a pair counts when
+        the Jaccard similarity of any of their texts reaches ``threshold``.
+        """
+        texts = [shingles(record.get(field)) for field in DUPLICATE_FIELDS]
+        candidates = set().union(*(self.duplicates.candidates(text) for text in texts))
+        matches = []
+        for key in candidates:
+            row = self.rows[key]
+            if status is not None and row["status"] != status:
+                continue
+            row_texts = [shingles(row.get(field)) for field in DUPLICATE_FIELDS]
+            similarity = max(jaccard(text, row_text) for text in texts for row_text in row_texts)
+            if similarity >= threshold:
+                matches.append((similarity, key))
+        matches.sort(reverse=True)
+        return matches
+
+    def count(self, status=None, category=None):
+        """Return how many reminders match ``status`` and ``category`` (None matches any)."""
+        if category is None:
+            return len(self.rows) if status is None else self.status_counts[status]
+        return sum(
+            count for (row_status, row_category), count in self.counts.items()
+            if (status is None or row_status == status)
+            and (category is None or row_category == category)
+        )
+
+    def count_overdue(self, day):
+        """Return how many pending reminders are dated before ISO ``day``.
+
+        The count is kept for the last day asked about. Moving to a later day
+        adds the buckets of the days in between; an earlier day, or a gap
+        longer than the number of buckets, recounts from the buckets.
+        """
+        previous = self._overdue_day
+        if previous is not None and day >= previous:
+            start, end = date.fromisoformat(previous), date.fromisoformat(day)
+            if (end - start).days <= len(self.pending_by_day):
+                for offset in range((end - start).days):
+                    self._overdue += self.pending_by_day.get((start + timedelta(days=offset)).isoformat(), 0)
+                self._overdue_day = day
+                return self._overdue
+        self._overdue = sum(count for bucket, count in self.pending_by_day.items() if bucket < day)
+        self._overdue_day = day
+        return self._overdue
+
+    def _occurrences(self, status, category, until):
+        """Return one date-ordered entry stream per matching pending recurring reminder.
+
+        Each stream runs from the reminder's date through ISO ``until``, or
+        just its date if that is later; non-pending and undated reminders,
+        and rules with no occurrence in that window, are listed once, like
+        any other.
+        """
+        streams = []
+        for key, rule in self.recurring.items():
+            record = self.rows[key]
+            if (status is not None and record["status"] != status) or (
+                    category is not None and record["category"] != category):
+                continue
+            if record["status"] != "pending" or not record["date"]:
+                streams.append(iter([(date_key(record["date"]), key)]))
+                continue
+            last = max(until, date_key(record["date"]))
+            streams.append(_occurrence_entries(rule, record["date"], last, key))
+        return streams
+
+    def count_listed(self, status=None, category=None, until=None):
+        """Return how many entries ``page`` lists, counting each occurrence through ``until``."""
+        total = self.count(status, category)
+        if until is None or not self.recurring:
+            return total
+        streams = self._occurrences(status, category, until)
+        return total - len(streams) + sum(sum(1 for _ in stream) for stream in streams)
+
+    def page(self, status=None, category=None, offset=0, limit=None, until=None):
+        """Return records ordered by date (undated last), skipping ``offset``.
+
+        With ISO ``until``, recurring reminders are listed once per
+        occurrence through that day, each as a copy of the record carrying
+        the occurrence's date and ``upcoming``: False for the reminder's
+        first listed occurrence, the one that can be completed, and True
+        for the later ones.
+        """
+        stop = None if limit is None else offset + limit
+        if until is not None and self.recurring:
+            one_off = (entry for entry in self._entries(status, category) if entry[1] not in self.recurring)
+            entries = heapq.merge(one_off, *self._occurrences(status, category, until))
+            return list(islice(self._listed(entries), offset, stop))
+        entries = self._entries(status, category)
+        if isinstance(entries, list):
+            selected = entries[offset:stop]
+        else:
+            selected = islice(entries, offset, stop)
+        return [self.rows[key] for _, key in selected]
+
+    def _listed(self, entries):
+        """Yield the record for each ``(date, key)`` entry, copying recurring ones."""
+        seen = set()
+        for day, key in entries:
+            if key not in self.recurring:
+                yield self.rows[key]
+                continue
+            yield dict(self.rows[key], date=day, upcoming=key in seen)
+            seen.add(key)
+
+    def _entries(self, status, category):
+        """Return the date-ordered ``(date, key)`` entries matching the filters."""
+        if category is not None:
+            entries = self.by_category.get(category, [])
+            if status is None:
+                return entries
+            return (entry for entry in entries if self.rows[entry[1]]["status"] == status)
+        if status is not None:
+            return self.by_status.get(status, [])
+        return heapq.merge(*self.by_status.values())
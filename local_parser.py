@@ -0,0 +1,283 @@
+"""Rule-based parser for simple reminders.
+
+Handles the common shapes ("call mom friday 5pm", "pay rent 2026-11-01",
+"dentist tomorrow at 9:30", "water plants every monday") without a network
+round trip. The result has
+the same fields as a Gemini parse, including a ``confidence`` score that
+callers use to decide whether to fall back to the model.
+"""
+import re
+from datetime import date, timedelta
+
+import recurrence
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+WEEKDAY_ABBREVIATIONS = {name[:3]: index for index, name in enumerate(WEEKDAYS)}
+WEEKDAY_ABBREVIATIONS.update({"tue": 1, "tues": 1, "wed": 2, "thu": 3, "thur": 3, "thurs": 3})
+MONTHS = [
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december",
+]
+
+CATEGORY_KEYWORDS = [
+    ("follow-up", r"follow[\s-]?up|check in with|get back to|reply to|respond to|remind \w+ about"),
+    ("appointment", r"appointment|appt|doctor|dentist|meeting|interview|haircut|lunch with|dinner with|coffee with|checkup|check-up|vet\b"),
+    ("opportunity", r"apply|application|opportunity|job|grant|scholarship|conference|hackathon"),
+]
+HIGH_PRIORITY = r"\burgent\b|\basap\b|\bimportant\b|\bcritical\b|\bhigh priority\b|!{2,}"
+LOW_PRIORITY = r"\blow priority\b|\bwhenever\b|\bsomeday\b|\bno rush\b|\bif time\b"
+
+# Temporal phrases we don't resolve; their presence means the model should.
+VAGUE_TEMPORAL = re.compile(
+    r"\b(next|this|coming|last|end of|beginning of|early|late|mid|weekend|morning|"
+    r"afternoon|evening|night|later|soon|week|month|year|\d+(st|nd|rd|th))\b"
+)
+
+_MONTH = "|".join(m[:3] + r"(?:" + m[3:] + r")?" for m in MONTHS)
+_WEEKDAY = "|".join(sorted(WEEKDAY_ABBREVIATIONS, key=len, reverse=True) + WEEKDAYS)
+
+ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+MONTH_DAY = re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b")
+DAY_MONTH = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})(?:,?\s+(\d{{4}}))?\b")
+RELATIVE_DAY = re.compile(r"\b(today|tonight|tomorrow|tmrw|tmr)\b")
+IN_DAYS = re.compile(r"\bin\s+(\d+|a|one|two|three)\s+(day|week)s?\b")
+# A bare abbreviation ("sun screen", "sat exam prep") is often an ordinary
+# word, so it is only read as a date after "on"/"next" or next to a time.
+WEEKDAY = re.compile(rf"\b(?:on\s+)?(next\s+)?({_WEEKDAY})\b")
+WEEKDAY_WORD = re.compile(rf"\b(?:{_WEEKDAY})\b")
+_TIME = r"(?:\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)|\d{1,2}:\d{2}|noon|midday|midnight)"
+TIME_AFTER = re.compile(rf"\s*(?:at\s+\d|{_TIME})")
+TIME_BEFORE = re.compile(rf"{_TIME}\s*$")
+TIME_12H = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)")
+TIME_24H = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+TIME_WORD = re.compile(r"\b(noon|midday|midnight)\b")
+AT_HOUR = re.compile(r"\bat\s+(\d{1,2})\b(?!\s*(?:st|nd|rd|th|:|\d))")
+
+_WEEKDAY_LIST = rf"(?:{_WEEKDAY})s?(?:\s*(?:,|and|&)\s*(?:{_WEEKDAY})s?)*"
+EVERY_WEEKDAY = re.compile(rf"\b(?:every|each)\s+(other\s+)?({_WEEKDAY_LIST})\b")
+_PLURAL_WEEKDAY = "(?:" + "|".join(name + "s" for name in WEEKDAYS) + ")"
+PLURAL_WEEKDAYS = re.compile(
+    rf"\b(?:on\s+)?({_PLURAL_WEEKDAY}(?:\s*(?:,|and|&)\s*{_PLURAL_WEEKDAY})*)\b"
+)
+WEEKDAYS_ONLY = re.compile(r"\b(?:every\s+weekday|on\s+weekdays|weekdays)\b")
+EVERY_N = re.compile(r"\bevery\s+(other|\d+)\s+(day|week|month|year)s?\b")
+EVERY_UNIT = re.compile(r"\b(?:every\s*(day|week|month|year)|(daily|weekly|monthly|yearly|annually))\b")
+MONTH_DAY_RULE = re.compile(
+    r"\b(?:on\s+)?(?:the\s+)?(first|1st|last)(?:\s+day)?\s+of\s+(?:each|every|the)\s+month\b"
+)
+FREQUENCY_WORDS = {
+    "day": "DAILY", "daily": "DAILY", "week": "WEEKLY", "weekly": "WEEKLY",
+    "month": "MONTHLY", "monthly": "MONTHLY", "year": "YEARLY", "yearly": "YEARLY", "annually": "YEARLY",
+}
+
+SMALL_NUMBERS = {"a": 1, "one": 1, "two": 2, "three": 3}
+FILLER = re.compile(
+    r"\b(on|at|by|for|due|before|starting|from)\s*$|^\s*(remind me to|remember to|i need to|need to|todo:?)\b",
+    re.IGNORECASE,
+)
+
+
+def _month_index(name):
+    return [m[:3] for m in MONTHS].index(name[:3]) + 1
+
+
+def _calendar_date(year, month, day, today, explicit_year):
+    try:
+        result = date(year, month, day)
+    except ValueError:
+        return None
+    if not explicit_year and result < today:
+        result = result.replace(year=year + 1)
+    return result
+
+
+def _find_date(text, today):
+    """Return ``(date, span)`` for the first date expression in ``text``."""
+    match = ISO_DATE.search(text)
+    if match:
+        try:
+            return date(*map(int, match.groups())), match.span()
+        except ValueError:
+            return None, match.span()
+
+    match = MONTH_DAY.search(text)
+    if match:
+        month, day, year = match.groups()
+        found = _calendar_date(int(year or today.year), _month_index(month), int(day), today, year)
+        return found, match.span()
+
+    match = DAY_MONTH.search(text)
+    if match:
+        day, month, year = match.groups()
+        found = _calendar_date(int(year or today.year), _month_index(month), int(day), today, year)
+        return found, match.span()
+
+    match = RELATIVE_DAY.search(text)
+    if match:
+        offset = 0 if match.group(1) in ("today", "tonight") else 1
+        return today + timedelta(days=offset), match.span()
+
+    match = IN_DAYS.search(text)
+    if match:
+        count = SMALL_NUMBERS.get(match.group(1)) or int(match.group(1))
+        days = count * (7 if match.group(2) == "week" else 1)
+        return today + timedelta(days=days), match.span()
+
+    for match in WEEKDAY.finditer(text):
+        name = match.group(2)
+        if name not in WEEKDAYS and match.group(0) == name and not _next_to_time(text, match):
+            continue
+        target = WEEKDAYS.index(name) if name in WEEKDAYS else WEEKDAY_ABBREVIATIONS[name]
+        days_ahead = (target - today.weekday()) % 7 or 7
+        if match.group(1) and days_ahead < 7:
+            # "next friday" said on a Monday means the Friday after this one
+            days_ahead += 7
+        return today + timedelta(days=days_ahead), match.span()
+
+    return None, None
+
+
+def _next_to_time(text, match):
+    return bool(TIME_AFTER.match(text, match.end()) or TIME_BEFORE.search(text, 0, match.start()))
+
+
+def _weekday_codes(text):
+    names = re.findall(_WEEKDAY, text)
+    indexes = {WEEKDAYS.index(name) if name in WEEKDAYS else WEEKDAY_ABBREVIATIONS[name] for name in names}
+    return ",".join(recurrence.WEEKDAY_CODES[index] for index in sorted(indexes))
+
+
+def _find_recurrence(text):
+    """Return ``(rule, span)`` for the first repetition phrase in ``text``."""
+    match = MONTH_DAY_RULE.search(text)
+    if match:
+        day = -1 if match.group(1) == "last" else 1
+        return f"FREQ=MONTHLY;BYMONTHDAY={day}", match.span()
+
+    match = WEEKDAYS_ONLY.search(text)
+    if match:
+        return "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR", match.span()
+
+    match = EVERY_WEEKDAY.search(text)
+    if match:
+        interval = ";INTERVAL=2" if match.group(1) else ""
+        return f"FREQ=WEEKLY{interval};BYDAY={_weekday_codes(match.group(2))}", match.span()
+
+    match = PLURAL_WEEKDAYS.search(text)
+    if match:
+        return f"FREQ=WEEKLY;BYDAY={_weekday_codes(match.group(1))}", match.span()
+
+    match = EVERY_N.search(text)
+    if match:
+        interval = 2 if match.group(1) == "other" else int(match.group(1))
+        rule = f"FREQ={FREQUENCY_WORDS[match.group(2)]}"
+        return (rule + f";INTERVAL={interval}" if interval > 1 else rule), match.span()
+
+    match = EVERY_UNIT.search(text)
+    if match:
+        return f"FREQ={FREQUENCY_WORDS[match.group(1) or match.group(2)]}", match.span()
+
+    return None, None
+
+
+def _find_time(text):
+    """Return ``("HH:MM", span)`` for the first time expression in ``text``."""
+    match = TIME_12H.search(text)
+    if match:
+        hour, minute, meridiem = match.groups()
+        hour = int(hour)
+        if 1 <= hour <= 12:
+            hour = hour % 12 + (12 if meridiem.startswith("p") else 0)
+            return f"{hour:02d}:{minute or '00'}", match.span()
+
+    match = TIME_24H.search(text)
+    if match:
+        return f"{int(match.group(1)):02d}:{match.group(2)}", match.span()
+
+    match = TIME_WORD.search(text)
+    if match:
+        return ("00:00" if match.group(1) == "midnight" else "12:00"), match.span()
+
+    match = AT_HOUR.search(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        hour = int(match.group(1))
+        # "at 5" without am/pm: assume working hours
+        if hour < 7:
+            hour += 12
+        return f"{hour:02d}:00", match.span()
+
+    return None, None
+
+
+def _cut(text, span):
+    return text[:span[0]] + " " + text[span[1]:]
+
+
+def _clean_title(text):
+    text = re.sub(HIGH_PRIORITY + "|" + LOW_PRIORITY, " ", text, flags=re.IGNORECASE)
+    text = re.sub(r"\s+", " ", text).strip(" ,.;:-!")
+    previous = None
+    while previous != text:
+        previous = text
+        text = FILLER.sub("", text).strip(" ,.;:-!")
+    return text[:1].upper() + text[1:]
+
+
+def parse_locally(user_input, today=None):
+    """Parse ``user_input`` with rules only, in the same shape as a Gemini parse."""
+    today = today or date.today()
+    text = re.sub(r"\s+", " ", user_input).strip()
+    lowered = text.lower()
+
+    # Repetition phrases go first, so "every monday" isn't read as a date.
+    rule, span = _find_recurrence(lowered)
+    if span:
+        text, lowered = _cut(text, span), _cut(lowered, span)
+    found_date, span = _find_date(lowered, today)
+    if span:
+        text, lowered = _cut(text, span), _cut(lowered, span)
+    if rule and found_date is None:
+        found_date = next(recurrence.occurrences(rule, today), None)
+    found_time, span = _find_time(lowered)
+    if span:
+        text, lowered = _cut(text, span), _cut(lowered, span)
+
+    if re.search(HIGH_PRIORITY, lowered):
+        priority = "High"
+    elif re.search(LOW_PRIORITY, lowered):
+        priority = "Low"
+    else:
+        priority = "Medium"
+
+    category = "task"
+    for name, pattern in CATEGORY_KEYWORDS:
+        if re.search(pattern, lowered):
+            category = name
+            break
+
+    title = _clean_title(text)
+
+    if not title:
+        confidence = 0.0
+    elif VAGUE_TEMPORAL.search(lowered):
+        confidence = 0.3
+    elif found_date is not None:
+        confidence = 0.9
+    else:
+        confidence = 0.7
+    if len(title.split()) > 10:
+        confidence -= 0.2
+    if len(WEEKDAY_WORD.findall(lowered)) > 1:
+        # Days we didn't take as the date, as in "gym mon wed fri 7am"
+        confidence = min(confidence, 0.3)
+
+    return {
+        "title": title,
+        "category": category,
+        "date": found_date.isoformat() if found_date else None,
+        "time": found_time,
+        "recurrence": rule,
+        "priority": priority,
+        "notes": "",
+        "confidence": round(max(confidence, 0.0), 2),
+    }
@@ -0,0 +1,162 @@
+"""Prometheus metrics for the app and the scheduler (needs ``prometheus_client``).
+
+``start(store)`` serves the metrics in the Prometheus text format on
+``NEVERMISS_METRICS_PORT`` and/or rewrites them to ``NEVERMISS_METRICS_FILE``
+(for node_exporter's textfile collector) every ``NEVERMISS_METRICS_INTERVAL``
+seconds. Durations arrive from ``timing`` spans as they are recorded, so
+the hot path only pays for one histogram observation per span; the store
+size, file-lock waits and parse cache hits are read from the counters the
+app already keeps, at collection time.
+
+Exported metrics:
+
+``nevermiss_span_duration_seconds{span}``
+    Histogram per timing span: ``rerun``, ``parse_reminder`` and
+    ``parse_with_gemini`` (whose counts are the parses issued),
+    ``gemini_request``, ``rate_limit_wait``, ``store_load``,
+    ``index_build``, ``store_write``, ``store_flush``, ``csv_write``, the
+    Dashboard spans and the scheduler's ``notify``.
+``nevermiss_span_errors_total{span}``
+    Spans that raised, e.g. failed ``gemini_request`` calls.
+``nevermiss_parse_cache_lookups_total{result}``
+    Parse cache hits and misses.
+``nevermiss_store_reminders{status}``
+    Stored reminders by status.
+``nevermiss_lock_waits_total``, ``nevermiss_lock_wait_seconds_total``, ``nevermiss_lock_wait_max_seconds``
+    File locks taken by the storage backends and the time spent waiting.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+import parse_cache
+import storage
+import timing
+
+METRICS_PORT = int(os.getenv("NEVERMISS_METRICS_PORT", 0))
+METRICS_FILE = os.getenv("NEVERMISS_METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("NEVERMISS_METRICS_INTERVAL", 15))
+
+# From sub-millisecond index lookups to Gemini calls near their timeout.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+logger = logging.getLogger(__name__)
+
+_registry = None
+_error = None
+_lock = threading.Lock()
+
+
+def enabled():
+    """Return whether a metrics port or file is configured."""
+    return bool(METRICS_PORT or METRICS_FILE)
+
+
+class CounterCollector:
+    """Report the counters kept by the storage and parse cache modules when collected."""
+
+    def __init__(self, store=None):
+        self.store = store
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        cache = parse_cache.cache_stats()
+        lookups = CounterMetricFamily("nevermiss_parse_cache_lookups", "Parse cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], cache["hits"])
+        lookups.add_metric(["miss"], cache["misses"])
+        yield lookups
+
+        locks = storage.lock_wait_stats()
+        yield CounterMetricFamily("nevermiss_lock_waits", "File locks taken by the storage backends",
+                                  value=locks["count"])
+        yield CounterMetricFamily("nevermiss_lock_wait_seconds", "Time spent waiting for file locks",
+                                  value=locks["total_seconds"])
+        yield GaugeMetricFamily("nevermiss_lock_wait_max_seconds", "Longest wait for a file lock",
+                                value=locks["max_seconds"])
+
+        # Only an IndexedStore counts without loading every reminder.
+        count = getattr(self.store, "count", None)
+        if count is not None:
+            try:
+                sizes = {status: count(status) for status in storage.STATUSES}
+            except Exception:
+                logger.exception("Could not count stored reminders")
+            else:
+                size = GaugeMetricFamily("nevermiss_store_reminders", "Stored reminders", labels=["status"])
+                for status, value in sizes.items():
+                    size.add_metric([status], value)
+                yield size
+
+
+def create_registry(store=None):
+    """Return a new registry and the ``timing`` listener that feeds its span metrics."""
+    from prometheus_client import CollectorRegistry, Counter, Histogram
+
+    registry = CollectorRegistry()
+    durations = Histogram("nevermiss_span_duration_seconds", "Duration of timed spans", ["span"],
+                          buckets=BUCKETS, registry=registry)
+    errors = Counter("nevermiss_span_errors", "Timed spans that raised an error", ["span"], registry=registry)
+    registry.register(CounterCollector(store))
+    children = {}
+
+    def observe(name, duration_ms, failed):
+        child = children.get(name)
+        if child is None:
+            child = children[name] = durations.labels(name)
+        child.observe(duration_ms / 1000)
+        if failed:
+            errors.labels(name).inc()
+
+    return registry, observe
+
+
+def start(store=None, port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_INTERVAL):
+    """Start exporting metrics, once per process, and return the registry.
+
+    ``store`` is asked for its size at collection time when it can count.
+    If exporting can't start, say because the port is taken, later calls
+    raise the same error instead of trying again.
+    """
+    global _registry, _error
+    with _lock:
+        if _registry is not None:
+            return _registry
+        if _error is not None:
+            raise _error
+        try:
+            _registry = _start(store, port, path, interval)
+        except (RuntimeError, OSError) as e:
+            _error = e
+            raise
+        return _registry
+
+
+def _start(store, port, path, interval):
+    try:
+        import prometheus_client
+    except ImportError:
+        raise RuntimeError("Metrics export requires prometheus_client (pip install prometheus-client)") from None
+    registry, observe = create_registry(store)
+    if port:
+        prometheus_client.start_http_server(port, registry=registry)
+        logger.info("Serving metrics on port %d", port)
+    if path:
+        def write():
+            try:
+                prometheus_client.write_to_textfile(path, registry)
+            except Exception:
+                logger.exception("Could not write metrics to %s", path)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                write()
+
+        threading.Thread(target=run, name="metrics-writer", daemon=True).start()
+        atexit.register(write)
+    # Only now that it is exported, so a failed start leaves no registry fed by every span.
+    timing.add_listener(observe)
+    return registry
@@ -0,0 +1,144 @@
+"""An offline stand-in for the Gemini model, for benchmarks and CI.
+
+``MockGeminiModel`` has the one method the parsing code calls,
+``generate_content(prompt, request_options)``, and answers with recorded
+responses: it reads the reminder inputs back out of the prompt and looks
+each one up in a JSON-lines recording (``{"input": ..., "response": {...}}``
+per line), falling back to the local parser's answer for inputs that were
+not recorded. Latency, the share of calls that fail and the share of
+answers wrapped in a markdown code fence are configurable, so parsing,
+caching, rate limiting and concurrency can be exercised without the API.
+
+``RecordingModel`` wraps a live model and appends each input and parsed
+answer to such a recording.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import date
+
+import local_parser
+import parse_cache
+import parsing
+
+RECORDINGS_FILE = os.getenv("NEVERMISS_MOCK_RECORDINGS")
+LATENCY_MS = float(os.getenv("NEVERMISS_MOCK_LATENCY_MS", 800))
+JITTER_MS = float(os.getenv("NEVERMISS_MOCK_JITTER_MS", 200))
+ERROR_RATE = float(os.getenv("NEVERMISS_MOCK_ERROR_RATE", 0))
+FENCE_RATE = float(os.getenv("NEVERMISS_MOCK_FENCE_RATE", 0.5))
+
+# Matches the prompts built by parsing.build_prompt and build_batch_prompt,
+# which embed each input as a JSON string, so it stays on one line.
+SINGLE_INPUT = re.compile(r"^User input: (\".*\")$", re.MULTILINE)
+BATCH_INPUT = re.compile(r"^\d+\. (\".*\")$", re.MULTILINE)
+TODAY = re.compile(r"from today (\d{4}-\d{2}-\d{2})")
+
+
+class MockAPIError(Exception):
+    """A simulated API failure, such as a quota or server error."""
+
+
+class MockResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def prompt_inputs(prompt):
+    """Return the user inputs in a single or batch parsing prompt."""
+    batch = BATCH_INPUT.findall(prompt)
+    if batch:
+        return [json.loads(item) for item in batch], True
+    return [json.loads(item) for item in SINGLE_INPUT.findall(prompt)[:1]], False
+
+
+def load_recordings(path):
+    """Return ``{normalized input: response}`` from a JSON-lines recording."""
+    recordings = {}
+    if path and os.path.exists(path):
+        with open(path) as handle:
+            for line in handle:
+                if line.strip():
+                    entry = json.loads(line)
+                    recordings[parse_cache.normalize_input(entry["input"])] = entry["response"]
+    return recordings
+
+
+class MockGeminiModel:
+    """Replay recorded parses with simulated latency, errors and fencing.
+
+    Each call sleeps for ``latency`` seconds give or take ``jitter``
+    (normally distributed), then fails with probability ``error_rate``;
+    a call that would outlast the request timeout raises ``TimeoutError``
+    once the timeout has passed. ``seed`` makes the sequence of delays,
+    failures and fences repeatable.
+    """
+
+    def __init__(self, recordings=RECORDINGS_FILE, latency=LATENCY_MS / 1000, jitter=JITTER_MS / 1000,
+                 error_rate=ERROR_RATE, fence_rate=FENCE_RATE, seed=None):
+        self.recordings = recordings if isinstance(recordings, dict) else load_recordings(recordings)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fence_rate = fence_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def respond(self, user_input, today):
+        """Return the recorded response for ``user_input``, or the local parser's."""
+        recorded = self.recordings.get(parse_cache.normalize_input(user_input))
+        return recorded if recorded is not None else local_parser.parse_locally(user_input, today)
+
+    def generate_content(self, prompt, request_options=None):
+        timeout = (request_options or {}).get("timeout")
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            fail = self._random.random() < self.error_rate
+            fence = self._random.random() < self.fence_rate
+            if fail:
+                self.errors += 1
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Mock Gemini request timed out after {timeout}s")
+        time.sleep(delay)
+        if fail:
+            raise MockAPIError("503 Simulated Gemini error")
+
+        inputs, batch = prompt_inputs(prompt)
+        if not inputs:
+            raise MockAPIError("400 Prompt has no reminder input")
+        match = TODAY.search(prompt)
+        today = date.fromisoformat(match.group(1)) if match else date.today()
+        answers = [self.respond(text, today) for text in inputs]
+        text = json.dumps(answers if batch else answers[0], indent=2)
+        if fence:
+            text = f"```json\n{text}\n```"
+        return MockResponse(text)
+
+
+class RecordingModel:
+    """Wrap ``model`` and append every parsed answer to the recording at ``path``."""
+
+    def __init__(self, model, path):
+        self.model = model
+        self.path = path
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, request_options=None):
+        response = self.model.generate_content(prompt, request_options=request_options)
+        inputs, batch = prompt_inputs(prompt)
+        try:
+            parsed = parsing.parse_response_text(response.text)
+        except ValueError:
+            return response
+        answers = parsed if batch else [parsed]
+        if isinstance(answers, list) and len(answers) == len(inputs):
+            with self._lock, open(self.path, "a") as handle:
+                for user_input, answer in zip(inputs, answers):
+                    handle.write(json.dumps({"input": user_input, "response": answer}) + "\n")
+        return response
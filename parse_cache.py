@@ -0,0 +1,130 @@
+"""On-disk cache of parsed reminders.
+
+Responses are keyed on the normalized user input plus the reference date
+given to the model, since relative dates like "tomorrow" resolve
+differently from one day to the next, and on a namespace naming the model
+and prompt that produced them, so answers from one model (say the offline
+mock) are never served in place of another's. Entries expire after a TTL and the
+least recently used ones are evicted once the cache exceeds its size.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+PARSE_CACHE_FILE = os.getenv("NEVERMISS_PARSE_CACHE", "parse_cache.db")
+PARSE_CACHE_TTL = float(os.getenv("NEVERMISS_PARSE_CACHE_TTL", 7 * 24 * 3600))
+PARSE_CACHE_SIZE = int(os.getenv("NEVERMISS_PARSE_CACHE_SIZE", 10000))
+
+
+def normalize_input(user_input):
+    """Collapse case, whitespace and trailing punctuation of ``user_input``."""
+    text = re.sub(r"\s+", " ", user_input).strip().lower()
+    return text.rstrip(" .!?")
+
+
+def cache_key(user_input, reference_date, namespace=""):
+    """Return the cache key for ``user_input`` parsed relative to ``reference_date`` in ``namespace``."""
+    raw = f"{namespace}\n{reference_date.isoformat()}\n{normalize_input(user_input)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ParseCache:
+    """SQLite-backed TTL + LRU cache of parse results."""
+
+    def __init__(self, path=PARSE_CACHE_FILE, ttl=PARSE_CACHE_TTL, max_entries=PARSE_CACHE_SIZE):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT, "
+                "created_at REAL, last_used REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_used "
+                "ON responses (last_used)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, user_input, reference_date, namespace=""):
+        """Return the cached result, or None on a miss or expired entry."""
+        key = cache_key(user_input, reference_date, namespace)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            _count("misses" if row is None else "hits")
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, user_input, reference_date, parsed, namespace=""):
+        """Store ``parsed`` and evict the least recently used overflow."""
+        key = cache_key(user_input, reference_date, namespace)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(parsed), now, now),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def cache_stats():
+    """Return how many lookups in this process hit or missed the cache."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def get_cache():
+    """Return the process-wide parse cache, or None if disabled."""
+    global _cache
+    with _cache_lock:
+        if _cache is None and PARSE_CACHE_FILE:
+            _cache = ParseCache()
+        return _cache
+
+
+def set_cache(cache):
+    """Use ``cache`` for all further parses, or go back to the configured one with None."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
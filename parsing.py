@@ -0,0 +1,353 @@
+"""Turn free-text reminders into structured fields with Gemini.
+
+The model comes from the LLM backend named by ``NEVERMISS_LLM_BACKEND``:
+``gemini`` (the API), ``mock`` (``mock_gemini.MockGeminiModel``, offline) or
+a ``module:attribute`` factory. A backend's model only needs a
+``generate_content(prompt, request_options)`` method returning an object
+with the answer in ``.text``.
+"""
+import importlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+import google.generativeai as genai
+
+import local_parser
+import parse_cache
+import timing
+
+MODEL_NAME = os.getenv("NEVERMISS_GEMINI_MODEL", "gemini-2.5-flash")
+GENERATION_CONFIG = json.loads(os.getenv("NEVERMISS_GEMINI_GENERATION_CONFIG", "{}"))
+LOCAL_PARSE_THRESHOLD = float(os.getenv("NEVERMISS_LOCAL_PARSE_THRESHOLD", 0.8))
+BATCH_SIZE = int(os.getenv("NEVERMISS_GEMINI_BATCH_SIZE", 20))
+GEMINI_CONCURRENCY = int(os.getenv("NEVERMISS_GEMINI_CONCURRENCY", 4))
+GEMINI_TIMEOUT = float(os.getenv("NEVERMISS_GEMINI_TIMEOUT", 30))
+GEMINI_RPM = float(os.getenv("NEVERMISS_GEMINI_RPM", 60))
+LLM_BACKEND = os.getenv("NEVERMISS_LLM_BACKEND", "gemini")
+LLM_RECORD_FILE = os.getenv("NEVERMISS_LLM_RECORD")
+
+# Part of every parse cache key; bump it when the prompts or FIELDS change
+# so answers to the old prompt are not reused.
+PROMPT_VERSION = 3
+
+FIELDS = """- title: A concise title for the reminder (string)
+- category: One of 'appointment', 'task', 'opportunity', 'follow-up' (string)
+- date: Date in ISO format YYYY-MM-DD if determinable, otherwise null (string or null)
+- time: Time in HH:MM format if mentioned, otherwise null (string or null)
+- recurrence: If the reminder repeats, an iCalendar RRULE using only FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL, BYDAY (weekly only), BYMONTHDAY (monthly only) and UNTIL, e.g. "FREQ=WEEKLY;BYDAY=MO"; otherwise null (string or null). For a repeating reminder, date is its first occurrence
+- priority: One of 'High', 'Medium', 'Low' (string)
+- notes: Any additional details from the input (string)
+- confidence: Confidence score 0-1 that the parsing is correct (number)"""
+
+
+_model = None
+_model_lock = threading.Lock()
+_configured_key = None
+
+
+def configure(api_key):
+    """Configure the Gemini SDK, once per process and API key."""
+    global _configured_key, _model
+    with _model_lock:
+        if api_key != _configured_key:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _model = None
+
+
+def _gemini_model():
+    return genai.GenerativeModel(MODEL_NAME, generation_config=GENERATION_CONFIG or None)
+
+
+def _mock_model():
+    import mock_gemini
+
+    return mock_gemini.MockGeminiModel()
+
+
+LLM_BACKENDS = {
+    "gemini": _gemini_model,
+    "mock": _mock_model,
+}
+
+
+def needs_api_key(backend=LLM_BACKEND):
+    """Return whether ``backend`` calls the Gemini API."""
+    return backend == "gemini"
+
+
+def create_model(backend=LLM_BACKEND, record_file=LLM_RECORD_FILE):
+    """Return a new model from ``backend``, recording its answers to ``record_file`` if set."""
+    if backend in LLM_BACKENDS:
+        factory = LLM_BACKENDS[backend]
+    elif ":" in backend:
+        module, attribute = backend.split(":", 1)
+        factory = getattr(importlib.import_module(module), attribute)
+    else:
+        raise ValueError(f"Unknown LLM backend: {backend!r}")
+    model = factory()
+    if record_file:
+        import mock_gemini
+
+        model = mock_gemini.RecordingModel(model, record_file)
+    return model
+
+
+def get_model():
+    """Return the process-wide model, creating it on first use.
+
+    Sharing one model keeps its underlying client, and so its HTTP
+    connections, alive across parses and sessions.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = create_model()
+        return _model
+
+
+def set_model(model):
+    """Use ``model`` for all further parses, or go back to the configured backend with None."""
+    global _model
+    with _model_lock:
+        _model = model
+
+
+def cache_namespace(model):
+    """Return the parse cache namespace for answers from ``model``.
+
+    Cached answers are only reused for the same model class, model name,
+    generation config and prompt version.
+    """
+    model = getattr(model, "model", model)  # look through a RecordingModel
+    kind = f"{type(model).__module__}.{type(model).__qualname__}"
+    name = getattr(model, "model_name", "")
+    return f"{kind}:{name}:{json.dumps(GENERATION_CONFIG, sort_keys=True)}:{PROMPT_VERSION}"
+
+
+def build_prompt(user_input, today):
+    """Return the Gemini prompt for ``user_input`` relative to ``today``."""
+    return f"""You are a reminder parsing assistant. Extract structured information from the user's input about a reminder or appointment.
+
+User input: {json.dumps(user_input)}
+
+Return ONLY valid JSON (no markdown, no code blocks) with these fields:
+{FIELDS}
+
+Handle vague dates intelligently (e.g., "next week" should be estimated from today {today.strftime('%Y-%m-%d')}).
+If the date cannot be determined at all, set to null.
+Return ONLY the JSON object, nothing else."""
+
+
+def build_batch_prompt(user_inputs, today):
+    """Return one Gemini prompt asking for a JSON array, one object per input."""
+    numbered = "\n".join(f"{i}. {json.dumps(text)}" for i, text in enumerate(user_inputs, 1))
+    return f"""You are a reminder parsing assistant. Extract structured information from each of the user's inputs about reminders or appointments.
+
+User inputs:
+{numbered}
+
+Return ONLY a valid JSON array (no markdown, no code blocks) with exactly {len(user_inputs)} objects, one per input and in the same order, each with these fields:
+{FIELDS}
+
+Handle vague dates intelligently (e.g., "next week" should be estimated from today {today.strftime('%Y-%m-%d')}).
+If the date cannot be determined at all, set to null.
+Return ONLY the JSON array, nothing else."""
+
+
+def split_bulk_input(text):
+    """Split pasted notes into one reminder per non-empty line, dropping list bullets."""
+    items = []
+    for line in text.splitlines():
+        line = re.sub(r"^\s*(?:[-*•]|\d+[.)]|\[[ xX]?\])\s*", "", line).strip()
+        if line:
+            items.append(line)
+    return items
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    A non-positive rate disables limiting.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every Gemini call in the process, so concurrent sessions and
+# bulk imports together stay within the API quota.
+rate_limiter = TokenBucket(GEMINI_RPM / 60, capacity=max(1, GEMINI_CONCURRENCY))
+
+
+def generate(model, prompt, timeout=GEMINI_TIMEOUT):
+    """Call ``model`` once, subject to the rate limit and a request timeout."""
+    with timing.span("gemini_request"):
+        with timing.span("rate_limit_wait"):
+            rate_limiter.acquire()
+        return model.generate_content(prompt, request_options={"timeout": timeout})
+
+
+def parse_response_text(text):
+    """Decode the model's JSON answer, tolerating a markdown code fence."""
+    json_text = text.strip()
+
+    # Clean up markdown code blocks if present
+    if json_text.startswith("```"):
+        json_text = json_text.split("```")[1]
+        if json_text.startswith("json"):
+            json_text = json_text[4:]
+        json_text = json_text.strip()
+
+    return json.loads(json_text)
+
+
+def parse_with_gemini(user_input, today=None, use_cache=True):
+    """Send user input to Gemini for parsing.
+
+    Results are served from the on-disk parse cache when possible. Errors
+    from the API or from decoding its answer are raised to the caller.
+    """
+    today = today or date.today()
+    with timing.span("parse_with_gemini"):
+        model = get_model()
+        namespace = cache_namespace(model)
+        cache = parse_cache.get_cache() if use_cache else None
+        if cache is not None:
+            cached = cache.get(user_input, today, namespace)
+            if cached is not None:
+                return cached
+
+        response = generate(model, build_prompt(user_input, today))
+        parsed = parse_response_text(response.text)
+
+        if cache is not None:
+            cache.put(user_input, today, parsed, namespace)
+        return parsed
+
+
+def parse_reminder(user_input, today=None, use_gemini=True, threshold=LOCAL_PARSE_THRESHOLD):
+    """Parse user input locally, asking Gemini only when the rules are unsure.
+
+    With ``use_gemini`` false the local result is returned whatever its
+    confidence, so the app keeps working without an API key.
+    """
+    today = today or date.today()
+    parsed = local_parser.parse_locally(user_input, today)
+    if parsed["confidence"] >= threshold or not use_gemini:
+        return parsed
+    return parse_with_gemini(user_input, today)
+
+
+def parse_concurrently(user_inputs, today=None, max_workers=GEMINI_CONCURRENCY):
+    """Parse each input with its own Gemini request on a bounded thread pool.
+
+    Returns ``(results, stats)``. ``results`` holds one parsed dict per input,
+    or None where that input failed; ``stats`` reports the item and error
+    counts, wall time and throughput of the run, plus each error message.
+    """
+    today = today or date.today()
+    results = [None] * len(user_inputs)
+    errors = {}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(parse_with_gemini, text, today): index
+            for index, text in enumerate(user_inputs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                errors[index] = str(e)
+    elapsed = time.perf_counter() - started
+    stats = {
+        "items": len(user_inputs),
+        "errors": len(errors),
+        "elapsed": elapsed,
+        "throughput": len(user_inputs) / elapsed if elapsed else 0.0,
+        "error_messages": errors,
+    }
+    return results, stats
+
+
+def parse_batch_with_gemini(user_inputs, today=None, batch_size=BATCH_SIZE, use_cache=True,
+                            max_workers=GEMINI_CONCURRENCY):
+    """Parse many inputs with one Gemini request per ``batch_size`` items.
+
+    Returns one parsed dict per input, in order. Inputs already in the parse
+    cache are not sent again, and up to ``max_workers`` batches are in flight
+    at once.
+    """
+    today = today or date.today()
+    model = get_model()
+    namespace = cache_namespace(model)
+    cache = parse_cache.get_cache() if use_cache else None
+    results = [None] * len(user_inputs)
+    pending = []
+    for index, user_input in enumerate(user_inputs):
+        cached = cache.get(user_input, today, namespace) if cache is not None else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append(index)
+
+    if not pending:
+        return results
+
+    def parse_batch(batch):
+        texts = [user_inputs[index] for index in batch]
+        response = generate(model, build_batch_prompt(texts, today))
+        parsed = parse_response_text(response.text)
+        if not isinstance(parsed, list) or len(parsed) != len(batch):
+            raise ValueError(
+                f"Expected a JSON array of {len(batch)} reminders, got {type(parsed).__name__}"
+                + (f" of {len(parsed)}" if isinstance(parsed, list) else "")
+            )
+        return parsed
+
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch, parsed in zip(batches, pool.map(parse_batch, batches)):
+            for index, item in zip(batch, parsed):
+                results[index] = item
+                if cache is not None:
+                    cache.put(user_inputs[index], today, item, namespace)
+    return results
+
+
+def parse_reminders_bulk(user_inputs, today=None, use_gemini=True, threshold=LOCAL_PARSE_THRESHOLD):
+    """Parse many inputs, batching the ones the local rules are unsure about."""
+    today = today or date.today()
+    results = [local_parser.parse_locally(text, today) for text in user_inputs]
+    if use_gemini:
+        unsure = [i for i, parsed in enumerate(results) if parsed["confidence"] < threshold]
+        parsed = parse_batch_with_gemini([user_inputs[i] for i in unsure], today)
+        for index, item in zip(unsure, parsed):
+            results[index] = item
+    return results
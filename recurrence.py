@@ -0,0 +1,167 @@
+"""Recurrence rules for repeating reminders.
+
+Rules use a subset of iCalendar RRULE syntax, e.g. ``FREQ=WEEKLY;BYDAY=MO,TH``:
+``FREQ`` (DAILY, WEEKLY, MONTHLY or YEARLY), ``INTERVAL``, ``BYDAY`` (weekly
+rules), ``BYMONTHDAY`` (monthly rules; negative days count back from the
+end of the month) and ``UNTIL`` (a date). Without ``BYDAY``/``BYMONTHDAY``
+a rule repeats on the weekday, day of month or date of its start.
+
+A recurring reminder is stored once. Its ``date`` is the first occurrence
+not yet completed, and later occurrences are generated lazily from there,
+only as far as the caller iterates.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from itertools import count
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+UNITS = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month", "YEARLY": "year"}
+
+# Rules like "the 31st of every 12th month from February" never match;
+# give up after this many periods without an occurrence.
+MAX_EMPTY_PERIODS = 1000
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def parse_rule(text):
+    """Parse a rule string into a dict, raising ValueError if it is invalid."""
+    parts = {}
+    for part in str(text).strip().upper().removeprefix("RRULE:").split(";"):
+        if not part:
+            continue
+        key, _, value = part.partition("=")
+        parts[key.strip()] = value.strip()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported recurrence frequency: {freq!r}")
+    rule = {"freq": freq, "interval": 1, "byday": None, "bymonthday": None, "until": None}
+    try:
+        if "INTERVAL" in parts:
+            rule["interval"] = int(parts.pop("INTERVAL"))
+        if "BYDAY" in parts:
+            rule["byday"] = sorted({WEEKDAY_CODES.index(code) for code in parts.pop("BYDAY").split(",")})
+        if "BYMONTHDAY" in parts:
+            rule["bymonthday"] = sorted({int(day) for day in parts.pop("BYMONTHDAY").split(",")})
+        if "UNTIL" in parts:
+            until = parts.pop("UNTIL")[:8].replace("-", "")
+            rule["until"] = date(int(until[:4]), int(until[4:6]), int(until[6:8]))
+    except (ValueError, IndexError):
+        raise ValueError(f"Invalid recurrence rule: {text!r}") from None
+    if parts:
+        raise ValueError(f"Unsupported recurrence rule parts: {', '.join(sorted(parts))}")
+    if rule["interval"] < 1:
+        raise ValueError("Recurrence interval must be at least 1")
+    if rule["byday"] and freq != "WEEKLY":
+        raise ValueError("BYDAY is only supported for weekly rules")
+    if rule["bymonthday"] and (freq != "MONTHLY" or any(not 1 <= abs(day) <= 31 for day in rule["bymonthday"])):
+        raise ValueError("BYMONTHDAY must be days 1-31 (or -1 to -31) of a monthly rule")
+    return rule
+
+
+def format_rule(rule):
+    """Return the canonical rule string for a parsed ``rule``."""
+    parts = [f"FREQ={rule['freq']}"]
+    if rule["interval"] != 1:
+        parts.append(f"INTERVAL={rule['interval']}")
+    if rule["byday"]:
+        parts.append("BYDAY=" + ",".join(WEEKDAY_CODES[day] for day in rule["byday"]))
+    if rule["bymonthday"]:
+        parts.append("BYMONTHDAY=" + ",".join(map(str, rule["bymonthday"])))
+    if rule["until"]:
+        parts.append(f"UNTIL={rule['until'].strftime('%Y%m%d')}")
+    return ";".join(parts)
+
+
+def describe(rule):
+    """Return a short description such as "Every 2 weeks on Mon, Thu"."""
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    unit = UNITS[rule["freq"]]
+    if rule["interval"] == 1:
+        text = rule["freq"].capitalize() if rule["freq"] != "DAILY" else "Daily"
+    else:
+        text = f"Every {rule['interval']} {unit}s"
+    if rule["byday"]:
+        text += " on " + ", ".join(WEEKDAY_NAMES[day] for day in rule["byday"])
+    if rule["bymonthday"]:
+        text += " on " + ", ".join("the last day" if day == -1 else f"day {day}" for day in rule["bymonthday"])
+    if rule["until"]:
+        text += f" until {rule['until'].isoformat()}"
+    return text
+
+
+def _periods(rule, start):
+    """Yield the candidate dates of each period (day, week, month or year) from ``start``."""
+    interval = rule["interval"]
+    if rule["freq"] == "DAILY":
+        for offset in count(0, interval):
+            yield [start + timedelta(days=offset)]
+    elif rule["freq"] == "WEEKLY":
+        week = start - timedelta(days=start.weekday())
+        weekdays = rule["byday"] or [start.weekday()]
+        for offset in count(0, interval):
+            monday = week + timedelta(weeks=offset)
+            yield [monday + timedelta(days=day) for day in weekdays]
+    elif rule["freq"] == "MONTHLY":
+        days = rule["bymonthday"] or [start.day]
+        for offset in count(0, interval):
+            year, month = divmod(start.month - 1 + offset, 12)
+            year, month = start.year + year, month + 1
+            length = calendar.monthrange(year, month)[1]
+            resolved = sorted({day if day > 0 else length + day + 1 for day in days})
+            yield [date(year, month, day) for day in resolved if 1 <= day <= length]
+    else:
+        for offset in count(0, interval):
+            try:
+                yield [start.replace(year=start.year + offset)]
+            except ValueError:  # February 29th outside a leap year
+                yield []
+
+
+def occurrences(rule, start):
+    """Yield the dates of ``rule`` on or after ``start``, in order, lazily."""
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    start = _as_date(start)
+    empty = 0
+    for candidates in _periods(rule, start):
+        found = False
+        for day in candidates:
+            if day < start:
+                continue
+            if rule["until"] and day > rule["until"]:
+                return
+            found = True
+            yield day
+        empty = 0 if found else empty + 1
+        if empty >= MAX_EMPTY_PERIODS:
+            return
+
+
+def occurrences_between(rule, start, first, last):
+    """Yield the occurrences from ``start`` that fall within ``first``..``last``."""
+    first, last = _as_date(first), _as_date(last)
+    for day in occurrences(rule, start):
+        if day > last:
+            return
+        if day >= first:
+            yield day
+
+
+def next_occurrence(rule, start, after):
+    """Return the first occurrence from ``start`` later than ``after``, or None."""
+    after = _as_date(after)
+    for day in occurrences(rule, start):
+        if day > after:
+            return day
+    return None
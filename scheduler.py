@@ -0,0 +1,303 @@
+"""Fire notifications when reminders fall due.
+
+Run ``python scheduler.py`` next to the app. Pending reminders are loaded
+once (with a filter the store can push down) into a min-heap keyed by due
+time, and the loop sleeps until the earliest one is due or the next poll.
+Each time it wakes it reads the store's ``changes()`` feed, which returns
+only the rows written since the last call, and reschedules those: new and
+reopened reminders are pushed, completed ones dropped and moved ones
+rescheduled, so the store is never rescanned (unless its change log was
+trimmed past the scheduler's position). A recurring reminder is in the heap
+once, for its next occurrence; after firing, the following occurrence is
+generated and pushed.
+
+Due reminders are passed to each configured notifier: ``log``, ``webhook``
+(POSTs the reminder as JSON) and ``desktop`` (``notify-send`` or
+``osascript``), or any ``module:attribute`` naming a class with a
+``notify(reminder)`` method.
+"""
+import heapq
+import importlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+
+import metrics
+import recurrence
+import storage
+import timing
+
+NOTIFIER_NAMES = os.getenv("NEVERMISS_NOTIFIERS", "log")
+WEBHOOK_URL = os.getenv("NEVERMISS_WEBHOOK_URL")
+POLL_SECONDS = float(os.getenv("NEVERMISS_SCHEDULER_POLL", 30))
+DEFAULT_DUE_TIME = os.getenv("NEVERMISS_DEFAULT_DUE_TIME", "09:00")
+CATCH_UP_SECONDS = float(os.getenv("NEVERMISS_SCHEDULER_CATCH_UP", 3600))
+
+logger = logging.getLogger(__name__)
+
+
+def due_datetime(reminder, default_time=DEFAULT_DUE_TIME):
+    """Return when ``reminder`` falls due, or None if it has no date.
+
+    Reminders without a time fall due at ``default_time`` on their date.
+    """
+    if not reminder.get("date"):
+        return None
+    day = datetime.strptime(str(reminder["date"])[:10], "%Y-%m-%d")
+    for value in (reminder.get("time"), default_time):
+        try:
+            clock = datetime.strptime(str(value).strip(), "%H:%M")
+        except (TypeError, ValueError):
+            continue
+        return day.replace(hour=clock.hour, minute=clock.minute)
+    return day
+
+
+def next_occurrence(reminder, since):
+    """Return a copy of ``reminder`` dated at its first occurrence due at or after ``since``.
+
+    One-off reminders are returned as they are; None if a recurring one has
+    no such occurrence.
+    """
+    rule = reminder.get("recurrence")
+    if not rule or not reminder.get("date"):
+        return reminder
+    try:
+        days = recurrence.occurrences(rule, reminder["date"])
+    except ValueError:
+        return reminder
+    for day in days:
+        occurrence = dict(reminder, date=day.isoformat())
+        if due_datetime(occurrence) >= since:
+            return occurrence
+    return None
+
+
+class LogNotifier:
+    """Write due reminders to the log."""
+
+    def notify(self, reminder):
+        logger.info("Reminder due: #%s %s (%s %s)", reminder["reminder_id"], reminder["title"],
+                    reminder.get("date"), reminder.get("time") or "")
+
+
+class WebhookNotifier:
+    """POST due reminders as JSON to ``url``."""
+
+    def __init__(self, url=WEBHOOK_URL, timeout=10):
+        if not url:
+            raise ValueError("The webhook notifier needs NEVERMISS_WEBHOOK_URL")
+        self.url = url
+        self.timeout = timeout
+
+    def notify(self, reminder):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(reminder).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class DesktopNotifier:
+    """Show due reminders as desktop notifications where the platform allows."""
+
+    def __init__(self):
+        if shutil.which("notify-send"):
+            self.command = lambda title, body: ["notify-send", title, body]
+        elif shutil.which("osascript"):
+            self.command = lambda title, body: [
+                "osascript", "-e", f"display notification {json.dumps(body)} with title {json.dumps(title)}"
+            ]
+        else:
+            raise ValueError("No desktop notification command (notify-send or osascript) found")
+
+    def notify(self, reminder):
+        body = " ".join(str(reminder.get(field) or "") for field in ("date", "time")).strip()
+        subprocess.run(self.command(f"⏰ {reminder['title']}", body), check=True, timeout=10)
+
+
+NOTIFIERS = {
+    "log": LogNotifier,
+    "webhook": WebhookNotifier,
+    "desktop": DesktopNotifier,
+}
+
+
+def get_notifiers(names=NOTIFIER_NAMES):
+    """Return notifier instances for a comma-separated list of names."""
+    notifiers = []
+    for name in filter(None, (name.strip() for name in names.split(","))):
+        if name in NOTIFIERS:
+            factory = NOTIFIERS[name]
+        elif ":" in name:
+            module, attribute = name.split(":", 1)
+            factory = getattr(importlib.import_module(module), attribute)
+        else:
+            raise ValueError(f"Unknown notifier: {name!r}")
+        notifiers.append(factory())
+    return notifiers
+
+
+class Scheduler:
+    """Min-heap of pending reminders by due time, dispatching to ``notifiers``.
+
+    ``schedule`` and ``cancel`` are incremental: rescheduling pushes a new
+    heap entry and leaves the old one to be skipped when popped, since the
+    ``due`` dict holds each reminder's current due time. ``fired`` holds
+    the due time last notified for each reminder, so a later change to a
+    reminder never notifies the same occurrence twice.
+    """
+
+    def __init__(self, notifiers, catch_up=CATCH_UP_SECONDS, clock=datetime.now):
+        self.notifiers = notifiers
+        self.catch_up = timedelta(seconds=catch_up)
+        self.clock = clock
+        self.heap = []
+        self.due = {}
+        self.reminders = {}
+        self.fired = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def __len__(self):
+        return len(self.due)
+
+    def schedule(self, reminder):
+        """Add ``reminder``, or move it if it is already scheduled."""
+        due = due_datetime(reminder)
+        reminder_id = int(reminder["reminder_id"])
+        with self._lock:
+            if due is None or reminder.get("status") != "pending":
+                self.due.pop(reminder_id, None)
+                self.reminders.pop(reminder_id, None)
+                return
+            self.due[reminder_id] = due
+            self.reminders[reminder_id] = reminder
+            heapq.heappush(self.heap, (due, reminder_id))
+            earliest = self.heap[0][0] == due
+        if earliest:
+            self._wakeup.set()
+
+    def update(self, reminder, now=None):
+        """Schedule the next notification for ``reminder`` as stored, or cancel it.
+
+        Occurrences overdue by more than the catch-up window, or already
+        notified, are skipped.
+        """
+        now = now or self.clock()
+        reminder_id = int(reminder["reminder_id"])
+        since = now - self.catch_up
+        if reminder_id in self.fired:
+            since = max(since, self.fired[reminder_id] + timedelta(seconds=1))
+        occurrence = None
+        if reminder.get("status") == "pending":
+            occurrence = next_occurrence(reminder, since)
+        due = due_datetime(occurrence) if occurrence else None
+        if due is None or due < since:
+            self.cancel(reminder_id)
+        else:
+            self.schedule(occurrence)
+
+    def reload(self, reminders, now=None):
+        """Replace everything scheduled with ``reminders``, the stored pending ones."""
+        with self._lock:
+            self.heap, self.due, self.reminders = [], {}, {}
+        for reminder in reminders:
+            self.update(reminder, now)
+
+    def cancel(self, reminder_id):
+        with self._lock:
+            self.due.pop(int(reminder_id), None)
+            self.reminders.pop(int(reminder_id), None)
+
+    def next_due(self):
+        """Return the earliest due time still scheduled, or None."""
+        with self._lock:
+            self._drop_stale()
+            return self.heap[0][0] if self.heap else None
+
+    def _drop_stale(self):
+        while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def pop_due(self, now=None):
+        """Remove and return the reminders due at ``now``, earliest first."""
+        now = now or self.clock()
+        due = []
+        with self._lock:
+            while True:
+                self._drop_stale()
+                if not self.heap or self.heap[0][0] > now:
+                    return due
+                due_at, reminder_id = heapq.heappop(self.heap)
+                del self.due[reminder_id]
+                self.fired[reminder_id] = due_at
+                due.append(self.reminders.pop(reminder_id))
+
+    def dispatch(self, reminder):
+        for notifier in self.notifiers:
+            try:
+                with timing.span("notify"):
+                    notifier.notify(reminder)
+            except Exception:
+                logger.exception("%s failed for reminder %s", type(notifier).__name__, reminder["reminder_id"])
+
+    def run(self, store, poll=POLL_SECONDS, stop=None):
+        """Load pending reminders from ``store`` and notify them as they fall due until ``stop`` is set."""
+        stop = stop or threading.Event()
+        pending = [("status", "==", "pending")]
+        # Taken before the load, so changes made during it are seen next.
+        _, cursor = store.changes()
+        self.reload(storage.to_records(store.load(filters=pending)))
+        logger.info("Scheduled %d reminders", len(self))
+
+        while not stop.is_set():
+            # Changes are applied before anything is dispatched, so a
+            # reminder completed (or, if recurring, moved past this
+            # occurrence) since it was scheduled is not notified.
+            changed, cursor = store.changes(cursor)
+            if changed is None:
+                logger.info("Store change log was trimmed; reloading pending reminders")
+                self.reload(storage.to_records(store.load(filters=pending)))
+            else:
+                for reminder in storage.to_records(changed):
+                    self.update(reminder)
+
+            for reminder in self.pop_due():
+                self.dispatch(reminder)
+                if reminder.get("recurrence"):
+                    following = next_occurrence(reminder, due_datetime(reminder) + timedelta(seconds=1))
+                    if following is not None:
+                        self.schedule(following)
+
+            next_due = self.next_due()
+            timeout = poll
+            if next_due is not None:
+                timeout = min(poll, max(0.0, (next_due - self.clock()).total_seconds()))
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = storage.BACKENDS[storage.STORAGE_BACKEND]()
+    if metrics.enabled():
+        metrics.start(store)
+    scheduler = Scheduler(get_notifiers())
+    try:
+        scheduler.run(store)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1376 @@
+"""Storage backends for reminders.
+
+Every backend exposes the same operations used by the app:
+``load(filters=None)`` returns the reminders as a DataFrame, optionally
+restricted by ``filters`` (a list of ``(column, op, value)`` conditions that
+must all hold, in the style of ``pyarrow`` filters), ``save(reminder_data)`` adds one
+reminder and returns its ID, ``save_many(reminders)`` adds several in one
+transaction and returns their IDs, ``update_statuses(changes)`` applies a
+``{reminder_id: status}`` mapping in one write,
+``update_status(reminder_id, status)`` changes the status of an
+existing one and ``version()`` returns a cheap token that changes whenever
+the stored data does, so callers can cache ``load()`` results.
+``changes(cursor=None)`` returns the rows changed since ``cursor`` plus a
+new cursor, or None for the rows when the store can't tell (on the first
+call, or after its change log was trimmed), so a long-running reader can
+follow the store without reloading it. The backend is picked with the
+``NEVERMISS_STORAGE`` environment variable.
+"""
+import atexit
+import fcntl
+import json
+import logging
+import operator
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import timing
+from duplicates import DUPLICATE_THRESHOLD
+from indexes import ReminderIndex, date_key
+
+COLUMNS = [
+    "reminder_id", "raw_input", "title", "category",
+    "date", "time", "recurrence", "priority", "notes", "status", "created_at"
+]
+CATEGORIES = ["appointment", "task", "opportunity", "follow-up"]
+PRIORITIES = ["High", "Medium", "Low"]
+STATUSES = ["pending", "completed"]
+
+# Declared column types applied by every backend on load. Enums become
+# categoricals (any unexpected values are kept as extra categories), dates
+# become datetime64 and free text uses the pandas string dtype.
+TEXT_COLUMNS = ["raw_input", "title", "time", "recurrence", "notes"]
+CATEGORY_COLUMNS = {"category": CATEGORIES, "priority": PRIORITIES, "status": STATUSES}
+DATE_COLUMNS = ["date", "created_at"]
+CSV_DTYPES = dict(
+    {"reminder_id": "int64"},
+    **{column: "string" for column in TEXT_COLUMNS + DATE_COLUMNS},
+    **{column: "category" for column in CATEGORY_COLUMNS},
+)
+
+STORAGE_BACKEND = os.getenv("NEVERMISS_STORAGE", "csv")
+CSV_FILE = os.getenv("NEVERMISS_CSV", "reminders.csv")
+SQLITE_FILE = os.getenv("NEVERMISS_DB", "reminders.db")
+LOG_FILE = os.getenv("NEVERMISS_LOG", "reminders.log")
+LOG_COMPACT_BYTES = int(os.getenv("NEVERMISS_LOG_COMPACT_BYTES", 1024 * 1024))
+PARQUET_DIR = os.getenv("NEVERMISS_PARQUET", "reminders_parquet")
+PARQUET_PARTITION = os.getenv("NEVERMISS_PARQUET_PARTITION", "status")
+WRITE_BEHIND_SECONDS = float(os.getenv("NEVERMISS_WRITE_BEHIND_MS", 250)) / 1000
+INDEX_FILE = os.getenv("NEVERMISS_INDEX", "reminders.idx")  # suffixed with the backend name
+RECURRENCE_HORIZON_DAYS = int(os.getenv("NEVERMISS_RECURRENCE_HORIZON_DAYS", 14))
+
+logger = logging.getLogger(__name__)
+
+
+DATE_LABELS = {"date": "Date as entered", "created_at": "Created as entered"}
+_migrated_dates = set()
+
+
+def apply_schema(frame):
+    """Return ``frame`` with the declared reminder column types.
+
+    Date text that isn't ISO (older versions stored whatever was typed) is
+    migrated rather than dropped, see ``_migrate_dates``.
+    """
+    frame = frame.reindex(columns=COLUMNS)
+    columns = {"reminder_id": frame["reminder_id"].astype("int64")}
+    for column in TEXT_COLUMNS:
+        columns[column] = frame[column].astype("string")
+    for column, known in CATEGORY_COLUMNS.items():
+        values = frame[column]
+        extra = sorted(set(values.dropna().astype(str)) - set(known))
+        columns[column] = values.astype(pd.CategoricalDtype(known + extra))
+    for column in DATE_COLUMNS:
+        values = frame[column]
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            raw = values
+            values = pd.to_datetime(values, format="ISO8601", errors="coerce")
+            text = raw[values.isna()].astype("string").str.strip()
+            legacy = (text.notna() & (text != "")).fillna(False).astype(bool)
+            if legacy.any():
+                values, columns["notes"] = _migrate_dates(
+                    column, columns["reminder_id"], text, values, columns["notes"], legacy
+                )
+        columns[column] = values
+    return pd.DataFrame(columns, index=frame.index)[COLUMNS]
+
+
+def _migrate_dates(column, ids, text, values, notes, legacy):
+    """Parse the ``legacy`` non-ISO values of a date ``column`` as well as possible.
+
+    Values such as "11/03/2026" are parsed leniently, others ("next friday")
+    are left empty; either way the text as entered is appended to the
+    reminder's notes, so rewriting the row loses nothing, and a warning
+    names the reminders once per process.
+    """
+    values = values.copy()
+    notes = notes.copy()
+    for index in legacy[legacy].index:
+        parsed = pd.to_datetime(text[index], errors="coerce")
+        if pd.notna(parsed):
+            values[index] = parsed.tz_localize(None) if parsed.tzinfo else parsed
+        note = f"{DATE_LABELS[column]}: {text[index]}"
+        existing = notes[index]
+        notes[index] = note if pd.isna(existing) or not existing else f"{existing}\n{note}"
+    migrated = [int(ids[index]) for index in legacy[legacy].index if (column, int(ids[index])) not in _migrated_dates]
+    if migrated:
+        _migrated_dates.update((column, reminder_id) for reminder_id in migrated)
+        logger.warning(
+            "Reminders %s have %s values that are not ISO dates; parsed what could be parsed "
+            "and kept the original text in their notes", ", ".join(map(str, migrated)), column,
+        )
+    return values, notes
+
+
+def format_dates(frame):
+    """Return a typed ``frame`` with its date columns as ISO strings, as stored on disk."""
+    return frame.assign(
+        date=frame["date"].dt.strftime("%Y-%m-%d"),
+        created_at=frame["created_at"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+    )
+
+
+def to_records(frame):
+    """Return the rows of ``frame`` as dicts of plain, JSON-safe values."""
+    frame = format_dates(apply_schema(frame)).astype(object)
+    frame = frame.where(pd.notna(frame), None)
+    return frame.to_dict("records")
+
+
+FILTER_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda values, value: values.isin(value),
+    "not in": lambda values, value: ~values.isin(value),
+}
+
+
+def _check_filter(column, op):
+    if column not in COLUMNS:
+        raise ValueError(f"Unknown reminder column: {column!r}")
+    if op not in FILTER_OPS:
+        raise ValueError(f"Unsupported filter operator: {op!r}")
+
+
+def filter_frame(frame, filters):
+    """Return the rows of a typed ``frame`` matching all ``filters``."""
+    if not filters:
+        return frame
+    mask = pd.Series(True, index=frame.index)
+    for column, op, value in filters:
+        _check_filter(column, op)
+        if column in DATE_COLUMNS:
+            value = [pd.Timestamp(v) for v in value] if op.endswith("in") else pd.Timestamp(value)
+        mask &= FILTER_OPS[op](frame[column], value).fillna(False).astype(bool)
+    return frame[mask]
+
+
+def empty_frame():
+    """Return an empty reminders DataFrame."""
+    return apply_schema(pd.DataFrame(columns=COLUMNS))
+
+
+_lock_wait_stats = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+_lock_wait_stats_lock = threading.Lock()
+
+
+def lock_wait_stats():
+    """Return how many file locks were taken and how long callers waited for them."""
+    with _lock_wait_stats_lock:
+        return dict(_lock_wait_stats)
+
+
+@contextmanager
+def file_lock(path, exclusive=True):
+    """Hold an advisory ``fcntl`` lock on ``path`` for the duration of the block.
+
+    The time spent waiting for the lock is added to ``lock_wait_stats()``.
+    """
+    with open(path, "a") as handle:
+        started = time.perf_counter()
+        fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        waited = time.perf_counter() - started
+        with _lock_wait_stats_lock:
+            _lock_wait_stats["count"] += 1
+            _lock_wait_stats["total_seconds"] += waited
+            _lock_wait_stats["max_seconds"] = max(_lock_wait_stats["max_seconds"], waited)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _record_write(store, before, after):
+    # Backends call this while still holding their write lock, so nothing
+    # else can have changed the store between ``before`` and ``after``.
+    store._writes.versions = before, after
+
+
+def take_write_versions(store):
+    """Return and forget the store versions around this thread's last write to ``store``.
+
+    Returns ``(before, after)``, or None if this thread has not written
+    since the last call. ``before`` is the version the write was applied
+    on top of, so a caller that knows its view of the store matched it
+    can adopt ``after`` without reloading.
+    """
+    writes = getattr(store, "_writes", None)
+    return writes.__dict__.pop("versions", None) if writes is not None else None
+
+
+class IdAllocator:
+    """Hand out increasing reminder IDs from a counter file.
+
+    The counter is read and advanced under an exclusive file lock, so
+    concurrent sessions and processes never receive the same ID and no
+    reminders have to be read to pick one. ``seed`` is called once, when
+    the counter file does not exist yet, and returns the highest ID in use.
+    """
+
+    def __init__(self, path, seed):
+        self.path = Path(path)
+        self.lock_path = Path(f"{path}.lock")
+        self.seed = seed
+
+    def allocate(self, count=1):
+        with file_lock(self.lock_path):
+            try:
+                next_id = int(self.path.read_text())
+            except FileNotFoundError:
+                next_id = int(self.seed()) + 1
+            tmp_path = Path(f"{self.path}.tmp")
+            tmp_path.write_text(str(next_id + count))
+            os.replace(tmp_path, self.path)
+        return list(range(next_id, next_id + count))
+
+
+def assign_ids(reminders_data, allocate):
+    """Return copies of ``reminders_data`` with missing IDs filled from ``allocate``."""
+    reminders_data = [dict(data) for data in reminders_data]
+    missing = [data for data in reminders_data if data.get("reminder_id") is None]
+    if missing:
+        for data, reminder_id in zip(missing, allocate(len(missing))):
+            data["reminder_id"] = reminder_id
+    return reminders_data
+
+
+def _max_id(ids):
+    return 0 if len(ids) == 0 else int(pd.Series(ids).max())
+
+
+class ChangeJournal:
+    """Append-only journal of the rows each write changed, for ``changes()``.
+
+    Used by the backends that have no change log of their own. Writers
+    append while holding the store's exclusive lock; once the journal is
+    past ``max_bytes`` the next write starts a new one, and readers whose
+    cursor still points into the old one are told to reload. Each journal
+    starts with a line holding a random name, since a new file may reuse
+    a deleted one's inode.
+    """
+
+    def __init__(self, path, max_bytes=1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._create(replace=False)
+
+    def _create(self, replace):
+        tmp_path = Path(f"{self.path}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps({"journal": uuid.uuid4().hex}) + "\n")
+        if replace:
+            os.replace(tmp_path, self.path)
+            return
+        try:
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            tmp_path.unlink()
+
+    def append(self, reminders):
+        line = (json.dumps(to_records(reminders)) + "\n").encode()
+        try:
+            full = self.path.stat().st_size > self.max_bytes
+        except FileNotFoundError:
+            full = True
+        if full:
+            self._create(replace=True)
+        with open(self.path, "ab") as journal:
+            journal.write(line)
+
+    def read(self, cursor=None):
+        """Return ``(reminders, cursor)``, the rows changed since ``cursor``.
+
+        ``reminders`` is None if the journal can't tell: on the first call,
+        or once the journal was restarted past the cursor.
+        """
+        try:
+            journal = open(self.path, "rb")
+        except FileNotFoundError:
+            self._create(replace=False)
+            journal = open(self.path, "rb")
+        with journal:
+            name = json.loads(journal.readline())["journal"]
+            if cursor is None or cursor[0] != name:
+                return None, (name, journal.seek(0, os.SEEK_END))
+            journal.seek(cursor[1])
+            data = journal.read()
+        # A line still being written is picked up next time.
+        data = data[:data.rfind(b"\n") + 1]
+        rows = [row for line in data.splitlines() for row in json.loads(line)]
+        changed = apply_schema(pd.DataFrame(rows, columns=COLUMNS))
+        return changed.drop_duplicates("reminder_id", keep="last"), (name, cursor[1] + len(data))
+
+
+class CSVStore:
+    """Keep all reminders in a single CSV file, rewritten on every change.
+
+    Every read-modify-write cycle holds an exclusive lock on a side file, so
+    concurrent sessions and server processes don't lose each other's
+    updates. The new file is written next to the old one and renamed over
+    it, so readers and crashes never see a half-written store.
+    """
+
+    def __init__(self, path=CSV_FILE):
+        self.path = Path(path)
+        self.lock_path = Path(f"{path}.lock")
+        self.ids = IdAllocator(f"{path}.next_id", self._max_id)
+        self.journal = ChangeJournal(f"{path}.changes")
+        self._writes = threading.local()
+
+    def version(self):
+        # Writes rename a freshly created file over the store, so every
+        # write changes the inode even if mtime and size happen to match.
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def load(self, filters=None):
+        if self.path.exists():
+            reminders = apply_schema(pd.read_csv(self.path, dtype=CSV_DTYPES))
+            return filter_frame(reminders, filters)
+        return empty_frame()
+
+    def changes(self, cursor=None):
+        return self.journal.read(cursor)
+
+    def _max_id(self):
+        if not self.path.exists():
+            return 0
+        return _max_id(pd.read_csv(self.path, usecols=["reminder_id"])["reminder_id"])
+
+    def _write(self, reminders, before, changed):
+        # Callers hold the file lock and pass the version they loaded.
+        tmp_path = Path(f"{self.path}.tmp")
+        with timing.span("csv_write"):
+            with open(tmp_path, "w", newline="") as handle:
+                format_dates(reminders).to_csv(handle, index=False)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.path)
+        self.journal.append(changed)
+        _record_write(self, before, self.version())
+
+    def save(self, reminder_data):
+        return self.save_many([reminder_data])[0]
+
+    def save_many(self, reminders_data):
+        reminders_data = assign_ids(reminders_data, self.ids.allocate)
+        with file_lock(self.lock_path):
+            before = self.version()
+            reminders = self.load()
+            new_reminders = apply_schema(pd.DataFrame(reminders_data))
+            reminders = apply_schema(pd.concat([reminders, new_reminders], ignore_index=True))
+            self._write(reminders, before, new_reminders)
+        return [data["reminder_id"] for data in reminders_data]
+
+    def update_status(self, reminder_id, status):
+        self.update_statuses({int(reminder_id): status})
+
+    def update_statuses(self, changes):
+        with file_lock(self.lock_path):
+            before = self.version()
+            reminders = self.load()
+            new_statuses = set(changes.values()) - set(reminders["status"].cat.categories)
+            if new_statuses:
+                reminders["status"] = reminders["status"].cat.add_categories(sorted(new_statuses))
+            statuses = reminders["reminder_id"].map(changes)
+            changed = statuses.notna()
+            reminders.loc[changed, "status"] = statuses[changed]
+            self._write(reminders, before, reminders[changed])
+
+    def update_dates(self, changes):
+        with file_lock(self.lock_path):
+            before = self.version()
+            reminders = self.load()
+            dates = pd.to_datetime(reminders["reminder_id"].map(changes), format="ISO8601")
+            changed = reminders["reminder_id"].isin(changes)
+            reminders.loc[changed, "date"] = dates[changed]
+            self._write(reminders, before, reminders[changed])
+
+
+class SQLiteStore:
+    """Keep reminders in an SQLite database in WAL mode.
+
+    Inserts and status changes are single-row statements, so their cost does
+    not grow with the number of stored reminders. Triggers also log the ID
+    of every changed row, keeping the latest ``changes_kept`` entries, for
+    ``changes()``. If the database is new and a CSV store exists next to
+    it, the CSV rows are imported once.
+    """
+
+    def __init__(self, path=SQLITE_FILE, import_csv=CSV_FILE, changes_kept=10000):
+        self.path = str(path)
+        self.changes_kept = changes_kept
+        self._local = threading.local()
+        self._writes = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reminders ("
+                "reminder_id INTEGER, raw_input TEXT, title TEXT, "
+                "category TEXT, date TEXT, time TEXT, recurrence TEXT, "
+                "priority TEXT, notes TEXT, status TEXT, created_at TEXT)"
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(reminders)")}
+            if "recurrence" not in existing:
+                # Databases created before recurring reminders existed
+                conn.execute("ALTER TABLE reminders ADD COLUMN recurrence TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reminders_id "
+                "ON reminders (reminder_id)"
+            )
+            # A single-row change counter bumped by triggers, so version()
+            # sees commits from every connection and process.
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)"
+            )
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', 0)")
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS reminders_version_{event.lower()} "
+                    f"AFTER {event} ON reminders BEGIN "
+                    "UPDATE meta SET value = value + 1 WHERE key = 'version'; END"
+                )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, reminder_id INTEGER)"
+            )
+            for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS reminders_changes_{event.lower()} "
+                    f"AFTER {event} ON reminders BEGIN "
+                    f"INSERT INTO changes (reminder_id) VALUES ({row}.reminder_id); END"
+                )
+        # Checked and imported under the write lock, so processes opening a
+        # new database together import the CSV file once.
+        with self._transaction() as conn:
+            empty = conn.execute("SELECT 1 FROM reminders LIMIT 1").fetchone() is None
+            if empty and import_csv and Path(import_csv).exists():
+                self._import(conn, CSVStore(import_csv).load())
+            # Seeded after any import so new IDs continue past imported ones.
+            conn.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('next_id', "
+                "(SELECT COALESCE(MAX(reminder_id), 0) + 1 FROM reminders))"
+            )
+
+    def _connect(self):
+        # sqlite3 connections may not be shared across threads, and
+        # Streamlit runs each session's script on its own thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _import(self, conn, frame):
+        self._insert(conn, to_records(frame))
+
+    @staticmethod
+    def _insert(conn, reminders_data):
+        conn.executemany(
+            f"INSERT INTO reminders ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(COLUMNS))})",
+            [[data.get(column) for column in COLUMNS] for data in reminders_data],
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so the versions
+        # read inside the transaction bracket exactly this write.
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = self.version()
+            yield conn
+            conn.execute(
+                "DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?",
+                (self.changes_kept,),
+            )
+            _record_write(self, before, self.version())
+
+    def version(self):
+        return self._connect().execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()[0]
+
+    def load(self, filters=None):
+        where, params = self._where(filters)
+        return apply_schema(pd.read_sql_query(
+            f"SELECT {', '.join(COLUMNS)} FROM reminders{where} ORDER BY rowid",
+            self._connect(),
+            params=params,
+        ))
+
+    def changes(self, cursor=None):
+        """Return ``(reminders, cursor)``, the rows changed since ``cursor``.
+
+        ``reminders`` is None on the first call, or once the log no longer
+        reaches back to ``cursor``.
+        """
+        conn = self._connect()
+        position = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        position = position[0] if position else 0
+        oldest = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+        if cursor is None or cursor > position or (oldest is not None and oldest > cursor + 1):
+            return None, position
+        ids = [row[0] for row in conn.execute(
+            "SELECT DISTINCT reminder_id FROM changes WHERE seq > ? AND seq <= ?", (cursor, position)
+        )]
+        if not ids:
+            return empty_frame(), position
+        changed = self.load(filters=[("reminder_id", "in", ids)])
+        return changed.drop_duplicates("reminder_id", keep="last"), position
+
+    @staticmethod
+    def _where(filters):
+        # Dates are stored as ISO text, which sorts like the dates themselves.
+        def sql_value(column, value):
+            if column == "date":
+                return pd.Timestamp(value).strftime("%Y-%m-%d")
+            if column == "created_at":
+                return pd.Timestamp(value).isoformat()
+            return value
+
+        clauses, params = [], []
+        for column, op, value in filters or []:
+            _check_filter(column, op)
+            if op.endswith("in"):
+                values = [sql_value(column, v) for v in value]
+                clauses.append(f"{column} {op.upper()} ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{column} {'=' if op == '==' else op} ?")
+                params.append(sql_value(column, value))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def save(self, reminder_data):
+        return self.save_many([reminder_data])[0]
+
+    def save_many(self, reminders_data):
+        with self._transaction() as conn:
+            # The IDs and the insert commit together and concurrent writers queue.
+            def allocate(count):
+                next_id = conn.execute(
+                    "UPDATE meta SET value = value + ? WHERE key = 'next_id' RETURNING value",
+                    (count,),
+                ).fetchone()[0]
+                return list(range(next_id - count, next_id))
+
+            reminders_data = assign_ids(reminders_data, allocate)
+            self._insert(conn, reminders_data)
+        return [data["reminder_id"] for data in reminders_data]
+
+    def update_status(self, reminder_id, status):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE reminders SET status = ? WHERE reminder_id = ?",
+                (status, int(reminder_id)),
+            )
+
+    def update_statuses(self, changes):
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE reminders SET status = ? WHERE reminder_id = ?",
+                [(status, int(reminder_id)) for reminder_id, status in changes.items()],
+            )
+
+    def update_dates(self, changes):
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE reminders SET date = ? WHERE reminder_id = ?",
+                [(str(day)[:10], int(reminder_id)) for reminder_id, day in changes.items()],
+            )
+
+
+def _event_ids(event):
+    """Return the IDs of the reminders an event log entry changes."""
+    if event["op"] == "create":
+        return [event["data"]["reminder_id"]]
+    if event["op"] == "create_many":
+        return [data["reminder_id"] for data in event["data"]]
+    if event["op"] == "status":
+        return [event["reminder_id"]]
+    return [reminder_id for reminder_id, _ in event["changes"]]
+
+
+class EventLogStore:
+    """Keep reminders as an append-only log of events plus a snapshot.
+
+    Saving a reminder appends a ``create`` event (``create_many`` for a
+    batch), changing its status appends a ``status`` event (``status_many``
+    for a batch) and moving recurring reminders on appends a ``date_many``
+    event, so every write is a single small append.
+    The current state is the snapshot with the log replayed on top; only
+    the part of the log not yet seen by this process is read on each load.
+    Once the log grows past ``compact_bytes`` a background thread folds it
+    into a new snapshot and truncates it.
+    """
+
+    def __init__(self, path=LOG_FILE, compact_bytes=LOG_COMPACT_BYTES, fsync=True):
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_suffix(".snapshot.json")
+        self.lock_path = self.path.with_suffix(".lock")
+        self.ids = IdAllocator(f"{path}.next_id", lambda: _max_id(self.load()["reminder_id"]))
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._writes = threading.local()
+        self._compacting = threading.Event()
+        self._rows = []
+        self._by_id = {}
+        self._snapshot_seen = None
+        self._offset = 0
+
+    def _reset(self, rows):
+        self._rows = []
+        self._by_id = {}
+        for row in rows:
+            self._apply({"op": "create", "data": row})
+
+    def _apply(self, event):
+        if event["op"] == "create":
+            row = {column: event["data"].get(column) for column in COLUMNS}
+            self._rows.append(row)
+            self._by_id.setdefault(row["reminder_id"], []).append(row)
+        elif event["op"] == "create_many":
+            for data in event["data"]:
+                self._apply({"op": "create", "data": data})
+        elif event["op"] == "status":
+            for row in self._by_id.get(event["reminder_id"], []):
+                row["status"] = event["status"]
+        elif event["op"] == "status_many":
+            for reminder_id, status in event["changes"]:
+                self._apply({"op": "status", "reminder_id": reminder_id, "status": status})
+        elif event["op"] == "date_many":
+            for reminder_id, day in event["changes"]:
+                for row in self._by_id.get(reminder_id, []):
+                    row["date"] = day
+
+    def changes(self, cursor=None):
+        """Return ``(reminders, cursor)``, the rows changed since ``cursor``.
+
+        The log itself records the changes. ``reminders`` is None on the
+        first call, or once the log was compacted past ``cursor``.
+        """
+        with file_lock(self.lock_path, exclusive=False), self._lock:
+            self._refresh()
+            position = self._snapshot_seen, self._offset
+            if cursor is None or cursor[0] != self._snapshot_seen or cursor[1] > self._offset:
+                return None, position
+            ids = set()
+            if self._offset > cursor[1]:
+                with open(self.path, "rb") as log:
+                    log.seek(cursor[1])
+                    for line in log.read(self._offset - cursor[1]).splitlines():
+                        ids.update(_event_ids(json.loads(line)))
+            rows = [row for reminder_id in ids for row in self._by_id.get(reminder_id, [])]
+        changed = apply_schema(pd.DataFrame(rows, columns=COLUMNS))
+        return changed.drop_duplicates("reminder_id", keep="last"), position
+
+    def _snapshot_id(self):
+        # Compaction replaces the snapshot file, so a new inode or mtime
+        # means the log we have replayed so far has been folded into it.
+        try:
+            stat = self.snapshot_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _refresh(self):
+        # Caller holds the shared file lock, so the snapshot and log are
+        # consistent with each other while we read them.
+        snapshot_id = self._snapshot_id()
+        if snapshot_id != self._snapshot_seen:
+            rows = []
+            if snapshot_id is not None:
+                rows = json.loads(self.snapshot_path.read_text())
+            self._reset(rows)
+            self._snapshot_seen = snapshot_id
+            self._offset = 0
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as log:
+            log.seek(self._offset)
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break  # partially written event; pick it up next time
+                self._apply(json.loads(line))
+                self._offset += len(line)
+
+    def _append(self, event):
+        line = (json.dumps(event, default=str) + "\n").encode()
+        with file_lock(self.lock_path, exclusive=False):
+            with open(self.path, "ab") as log:
+                log.write(line)
+                log.flush()
+                if self.fsync:
+                    os.fsync(log.fileno())
+                size = log.tell()
+            # Appenders share the lock, but an append lands in one piece at
+            # the end of the log, so it started where our line starts.
+            snapshot_id = self._snapshot_id()
+            _record_write(self, (snapshot_id, size - len(line)), (snapshot_id, size))
+        if size > self.compact_bytes and not self._compacting.is_set():
+            self._compacting.set()
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        finally:
+            self._compacting.clear()
+
+    def compact(self):
+        """Fold the log into the snapshot and truncate the log."""
+        with file_lock(self.lock_path), self._lock:
+            self._refresh()
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._rows, default=str))
+            os.replace(tmp_path, self.snapshot_path)
+            with open(self.path, "wb") as log:
+                if self.fsync:
+                    os.fsync(log.fileno())
+            self._snapshot_seen = self._snapshot_id()
+            self._offset = 0
+
+    def version(self):
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        # The log only grows between compactions, and compaction replaces
+        # the snapshot, so the pair identifies the stored state.
+        return self._snapshot_id(), size
+
+    def load(self, filters=None):
+        with file_lock(self.lock_path, exclusive=False), self._lock:
+            self._refresh()
+            if not self._rows:
+                return empty_frame()
+            reminders = apply_schema(pd.DataFrame(self._rows, columns=COLUMNS))
+        return filter_frame(reminders, filters)
+
+    def save(self, reminder_data):
+        data = assign_ids([reminder_data], self.ids.allocate)[0]
+        data["reminder_id"] = int(data["reminder_id"])
+        self._append({"op": "create", "data": data})
+        return data["reminder_id"]
+
+    def save_many(self, reminders_data):
+        rows = assign_ids(reminders_data, self.ids.allocate)
+        for data in rows:
+            data["reminder_id"] = int(data["reminder_id"])
+        # One event for the whole batch, so readers never see half of it.
+        self._append({"op": "create_many", "data": rows})
+        return [data["reminder_id"] for data in rows]
+
+    def update_status(self, reminder_id, status):
+        self._append({"op": "status", "reminder_id": int(reminder_id), "status": status})
+
+    def update_statuses(self, changes):
+        changes = [[int(reminder_id), status] for reminder_id, status in changes.items()]
+        self._append({"op": "status_many", "changes": changes})
+
+    def update_dates(self, changes):
+        changes = [[int(reminder_id), str(day)[:10]] for reminder_id, day in changes.items()]
+        self._append({"op": "date_many", "changes": changes})
+
+
+class ParquetStore:
+    """Keep reminders in a hive-partitioned Parquet dataset (needs ``pyarrow``).
+
+    The dataset is partitioned by ``status`` or by the ``month`` of the
+    reminder date, and ``load`` filters are pushed down to the Parquet
+    reader, so loading only pending reminders or a date window skips the
+    other partitions and row groups. Saves write new files instead of
+    rewriting the dataset; partitions are compacted once they accumulate
+    ``compact_files`` files.
+    """
+
+    def __init__(self, path=PARQUET_DIR, partition=PARQUET_PARTITION, compact_files=64):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The parquet storage backend requires pyarrow (pip install pyarrow)") from None
+        if partition not in ("status", "month"):
+            raise ValueError(f"Unsupported parquet partitioning: {partition!r}")
+        self.path = Path(path)
+        self.partition = partition
+        self.compact_files = compact_files
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.version_path = self.path / "_version"
+        self.lock_path = self.path / "_lock"
+        self.ids = IdAllocator(self.path / "_next_id", self._max_id)
+        self.journal = ChangeJournal(self.path / "_changes")
+        self._writes = threading.local()
+
+    def version(self):
+        try:
+            return self.version_path.read_text()
+        except FileNotFoundError:
+            return None
+
+    def _touch_version(self, before):
+        # Writers hold the file lock, so only this write happened since ``before``.
+        tmp_path = self.version_path.with_suffix(".tmp")
+        tmp_path.write_text(uuid.uuid4().hex)
+        os.replace(tmp_path, self.version_path)
+        _record_write(self, before, self.version())
+
+    def _files(self):
+        return sorted(self.path.glob("*=*/*.parquet"))
+
+    def _partition_filters(self, filters):
+        # Derive month partition bounds from date conditions so whole
+        # months outside the window are never opened. Undated reminders
+        # live in the "undated" partition, which sorts after every month.
+        if self.partition != "month":
+            return []
+        derived = []
+        for column, op, value in filters:
+            if column == "date" and op in ("==", "<", "<=", ">", ">="):
+                month = pd.Timestamp(value).strftime("%Y-%m")
+                derived.append(("month", {"==": "==", "<": "<=", ">": ">="}.get(op, op), month))
+        return derived
+
+    def load(self, filters=None):
+        if not self._files():
+            return empty_frame()
+        filters = list(filters or [])
+        for column, op in ((column, op) for column, op, _ in filters):
+            _check_filter(column, op)
+        arrow_filters = [
+            (column, op, [pd.Timestamp(v) for v in value] if op.endswith("in") else pd.Timestamp(value))
+            if column in DATE_COLUMNS else (column, op, value)
+            for column, op, value in filters
+        ] + self._partition_filters(filters)
+        with file_lock(self.lock_path, exclusive=False):
+            reminders = pd.read_parquet(self.path, filters=arrow_filters or None)
+        if reminders.empty:
+            return empty_frame()
+        if "month" in reminders:
+            reminders = reminders.drop(columns="month")
+        reminders = apply_schema(reminders)
+        return reminders.sort_values("reminder_id", kind="stable").reset_index(drop=True)
+
+    def changes(self, cursor=None):
+        return self.journal.read(cursor)
+
+    def _write(self, reminders):
+        reminders = apply_schema(reminders)
+        if self.partition == "month":
+            reminders = reminders.assign(
+                month=reminders["date"].dt.strftime("%Y-%m").fillna("undated")
+            )
+        else:
+            reminders = reminders.assign(status=reminders["status"].astype(str))
+        reminders.to_parquet(
+            self.path,
+            partition_cols=[self.partition],
+            index=False,
+            basename_template=f"{uuid.uuid4().hex}-{{i}}.parquet",
+        )
+
+    def _max_id(self):
+        if not self._files():
+            return 0
+        return _max_id(pd.read_parquet(self.path, columns=["reminder_id"])["reminder_id"])
+
+    def save(self, reminder_data):
+        return self.save_many([reminder_data])[0]
+
+    def save_many(self, reminders_data):
+        reminders_data = assign_ids(reminders_data, self.ids.allocate)
+        with file_lock(self.lock_path):
+            before = self.version()
+            self._write(pd.DataFrame(reminders_data))
+            self._compact_crowded_partitions()
+            self.journal.append(pd.DataFrame(reminders_data))
+            self._touch_version(before)
+        return [data["reminder_id"] for data in reminders_data]
+
+    def update_status(self, reminder_id, status):
+        self.update_statuses({int(reminder_id): status})
+
+    def update_statuses(self, changes):
+        self._update_column("status", changes)
+
+    def update_dates(self, changes):
+        self._update_column("date", {reminder_id: str(day)[:10] for reminder_id, day in changes.items()})
+
+    def _update_column(self, column, changes):
+        # Changed rows are rewritten into new files, which moves them to
+        # their new partition when the column is the partition key.
+        import pyarrow.parquet as pq
+
+        changes = {int(reminder_id): value for reminder_id, value in changes.items()}
+        with file_lock(self.lock_path):
+            before = self.version()
+            moved = []
+            for path in self._files():
+                ids = pq.read_table(path, columns=["reminder_id"]).column("reminder_id").to_pandas()
+                if not ids.isin(changes).any():
+                    continue
+                rows = self._read_file(path)
+                hit = rows["reminder_id"].isin(changes)
+                moved.append(rows[hit].assign(**{column: rows.loc[hit, "reminder_id"].map(changes)}))
+                self._replace_file(path, rows[~hit])
+            if moved:
+                moved = pd.concat(moved, ignore_index=True)
+                self._write(moved)
+                self._compact_crowded_partitions()
+                self.journal.append(moved)
+                self._touch_version(before)
+
+    def _read_file(self, path):
+        import pyarrow.parquet as pq
+
+        rows = pq.read_table(path).to_pandas()
+        # Partition values live in the directory name, not the file.
+        key, value = path.parent.name.split("=", 1)
+        rows[key] = value
+        return rows.drop(columns="month", errors="ignore")
+
+    def _replace_file(self, path, rows):
+        if not rows.empty:
+            self._write(rows)
+        path.unlink()
+
+    def _compact_crowded_partitions(self):
+        # Caller holds the file lock and touches the version afterwards.
+        for partition_dir in self.path.glob("*=*"):
+            if len(list(partition_dir.glob("*.parquet"))) > self.compact_files:
+                self._compact(partition_dir)
+
+    def _compact(self, directory):
+        files = sorted(directory.glob("*.parquet"))
+        if len(files) < 2:
+            return
+        rows = pd.concat([self._read_file(path) for path in files], ignore_index=True)
+        self._write(rows)
+        for path in files:
+            path.unlink()
+
+    def compact(self, partition_dir=None):
+        """Rewrite each partition (or just ``partition_dir``) as a single file."""
+        with file_lock(self.lock_path):
+            before = self.version()
+            dirs = [Path(partition_dir)] if partition_dir else list(self.path.glob("*=*"))
+            for directory in dirs:
+                self._compact(directory)
+            self._touch_version(before)
+
+
+class WriteBehindStore:
+    """Queue status changes in memory and flush them to ``store`` in batches.
+
+    ``update_status`` only records the change, so the UI doesn't wait for
+    the write; ``load`` overlays queued changes on what the store returns,
+    so the change is visible immediately in this process. A background
+    thread waits ``delay`` seconds after the first queued change, collecting
+    any further ones (later changes to the same reminder replace earlier
+    ones), then writes them with a single ``update_statuses`` call. Other
+    processes see the changes once they are flushed.
+    """
+
+    def __init__(self, store, delay=WRITE_BEHIND_SECONDS):
+        self.store = store
+        self.delay = delay
+        self._pending = {}
+        self._inflight = {}
+        self._flush_listeners = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+        atexit.register(self.flush)
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def _overlay(self):
+        # Changes being written stay visible until the write has finished.
+        return {**self._inflight, **self._pending}
+
+    def version(self):
+        with self._lock:
+            # The queued changes fully determine the overlay on top of the
+            # store, and an empty queue gives the store's own version back.
+            return self.store.version(), tuple(sorted(self._overlay().items()))
+
+    def base_version(self):
+        """Return the wrapped store's version, ignoring queued changes."""
+        return self.store.version()
+
+    def add_flush_listener(self, listener):
+        """Call ``listener(before, after)`` with the store versions around each flush.
+
+        ``before`` is the version the flush was applied on top of, as
+        reported by ``take_write_versions``.
+        """
+        self._flush_listeners.append(listener)
+
+    def remove_flush_listener(self, listener):
+        self._flush_listeners.remove(listener)
+
+    def load(self, filters=None):
+        with self._lock:
+            pending = self._overlay()
+        if not pending:
+            return self.store.load(filters=filters)
+        # Status filters are applied after the overlay, so a queued change
+        # moves a reminder in or out of the result straight away.
+        filters = list(filters or [])
+        store_filters = [f for f in filters if f[0] != "status"]
+        reminders = self.store.load(filters=store_filters or None)
+        statuses = reminders["reminder_id"].map(pending)
+        changed = statuses.notna()
+        if changed.any():
+            new_statuses = set(statuses[changed]) - set(reminders["status"].cat.categories)
+            if new_statuses:
+                reminders["status"] = reminders["status"].cat.add_categories(sorted(new_statuses))
+            reminders.loc[changed, "status"] = statuses[changed]
+        return filter_frame(reminders, filters)
+
+    def save(self, reminder_data):
+        return self.store.save(reminder_data)
+
+    def save_many(self, reminders_data):
+        return self.store.save_many(reminders_data)
+
+    def update_status(self, reminder_id, status):
+        self.update_statuses({reminder_id: status})
+
+    def update_statuses(self, changes):
+        with self._lock:
+            self._pending.update({int(reminder_id): status for reminder_id, status in changes.items()})
+        self._wakeup.set()
+
+    def update_dates(self, changes):
+        self.store.update_dates(changes)
+
+    def flush(self):
+        """Write all queued changes to the store now."""
+        with self._flush_lock:
+            with self._lock:
+                changes, self._pending = self._pending, {}
+                self._inflight = changes
+            if not changes:
+                return
+            take_write_versions(self.store)
+            try:
+                with timing.span("store_flush"):
+                    self.store.update_statuses(changes)
+            except Exception:
+                with self._lock:
+                    # Keep the failed batch unless newer changes replaced it.
+                    self._pending = {**changes, **self._pending}
+                    self._inflight = {}
+                raise
+            versions = take_write_versions(self.store)
+            with self._lock:
+                self._inflight = {}
+            if versions is not None:
+                for listener in self._flush_listeners:
+                    listener(*versions)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush queued status changes; retrying")
+                self._wakeup.set()
+
+
+# Never equal to a store version, so the next query rebuilds the index.
+_STALE = object()
+
+
+class IndexedStore:
+    """Answer Dashboard queries from a ``ReminderIndex`` kept in step with ``store``.
+
+    Saves and status changes made through this wrapper patch the index
+    directly, provided the store was still at the version the index
+    reflects when the write began. If it moved for any other reason
+    (another session or process wrote to it), the index is rebuilt from a
+    full load on the next query. Behind a ``WriteBehindStore`` the index follows the underlying
+    store's version, and a flush of changes it already holds moves that
+    version along instead of forcing a rebuild. The index is pickled to
+    ``path`` at exit together with the store version it reflects, so a
+    restart with unchanged data skips the rebuild.
+    """
+
+    def __init__(self, store, path=INDEX_FILE):
+        self.store = store
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._index = None
+        self._version = None
+        self._dirty = False
+        self._base_version = getattr(store, "base_version", store.version)
+        add_flush_listener = getattr(store, "add_flush_listener", None)
+        if add_flush_listener is not None:
+            add_flush_listener(self._flushed)
+        self._restore()
+        if self.path is not None:
+            atexit.register(self.persist)
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def _restore(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "rb") as handle:
+                index_format, self._version, self._index = pickle.load(handle)
+        except Exception:
+            logger.warning("Ignoring unreadable index file %s", self.path)
+            self._version, self._index = None, None
+            return
+        if index_format != ReminderIndex.FORMAT:
+            self._version, self._index = None, None
+
+    def persist(self):
+        """Write the index to disk if it changed since it was loaded."""
+        flush = getattr(self.store, "flush", None)
+        if flush is not None:
+            flush()
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            self._sync()
+            tmp_path = Path(f"{self.path}.tmp")
+            with open(tmp_path, "wb") as handle:
+                pickle.dump((ReminderIndex.FORMAT, self._version, self._index), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def close(self):
+        """Persist the index and release it, for a store that is no longer used."""
+        self.persist()
+        if self.path is not None:
+            atexit.unregister(self.persist)
+        remove_flush_listener = getattr(self.store, "remove_flush_listener", None)
+        if remove_flush_listener is not None:
+            remove_flush_listener(self._flushed)
+        with self._lock:
+            self._index, self._version = None, None
+
+    def _flushed(self, before, after):
+        with self._lock:
+            if self._version == before:
+                self._version = after
+                self._dirty = True
+
+    def _sync(self):
+        version = self._base_version()
+        if self._index is None or version != self._version:
+            with timing.span("store_load"):
+                records = to_records(self.store.load())
+            with timing.span("index_build"):
+                self._index = ReminderIndex.build(records, previous=self._index)
+            self._version = version
+            self._dirty = True
+        return self._index
+
+    def version(self):
+        return self.store.version()
+
+    def load(self, filters=None):
+        return self.store.load(filters=filters)
+
+    def save(self, reminder_data):
+        return self.save_many([reminder_data])[0]
+
+    def _write(self, write, *args):
+        # Patch the index only if nobody else wrote between the version it
+        # reflects and our write; otherwise drop it and rebuild next time.
+        index = self._sync()
+        take_write_versions(self.store)
+        with timing.span("store_write"):
+            result = write(*args)
+        versions = take_write_versions(self.store)
+        if versions is None:
+            # Queued by a WriteBehindStore; its flush moves the version on.
+            return index, result
+        before, after = versions
+        if before != self._version:
+            # Kept, stale, so the rebuild can reuse its duplicate hashes.
+            self._version = _STALE
+            return None, result
+        self._version = after
+        self._dirty = True
+        return index, result
+
+    def save_many(self, reminders_data):
+        reminders_data = list(reminders_data)
+        with self._lock:
+            index, ids = self._write(self.store.save_many, reminders_data)
+            if index is not None:
+                saved = [dict(data, reminder_id=reminder_id) for data, reminder_id in zip(reminders_data, ids)]
+                for record in to_records(pd.DataFrame(saved)):
+                    index.insert(record)
+        return ids
+
+    def update_status(self, reminder_id, status):
+        self.update_statuses({reminder_id: status})
+
+    def update_statuses(self, changes):
+        with self._lock:
+            index, _ = self._write(self.store.update_statuses, changes)
+            if index is not None:
+                for reminder_id, status in changes.items():
+                    index.set_status(int(reminder_id), status)
+
+    def update_dates(self, changes):
+        with self._lock:
+            index, _ = self._write(self.store.update_dates, changes)
+            if index is not None:
+                for reminder_id, day in changes.items():
+                    index.set_date(int(reminder_id), str(day)[:10])
+
+    def count(self, status=None, category=None, query=None, today=None):
+        """Return how many reminders match ``status``, ``category`` and search ``query``.
+
+        With ``today``, recurring reminders count once per occurrence that
+        ``page`` lists for that day.
+        """
+        with self._lock:
+            index = self._sync()
+            if query:
+                return index.count_matches(query, status, category)
+            if today is not None:
+                return index.count_listed(status, category, self._listing_end(today))
+            return index.count(status, category)
+
+    @staticmethod
+    def _listing_end(today):
+        return (today + timedelta(days=RECURRENCE_HORIZON_DAYS)).isoformat()
+
+    def count_overdue(self, today):
+        """Return how many pending reminders are dated before ``today``."""
+        with self._lock:
+            return self._sync().count_overdue(today.isoformat())
+
+    def summary(self, today):
+        """Return the total, pending, completed and overdue counts for the Summary section."""
+        with self._lock:
+            index = self._sync()
+            return {
+                "total": index.count(),
+                "pending": index.count("pending"),
+                "completed": index.count("completed"),
+                "overdue": index.count_overdue(today.isoformat()),
+            }
+
+    def find_duplicates(self, reminder_data, threshold=DUPLICATE_THRESHOLD, limit=3):
+        """Return up to ``limit`` pending reminders whose text is close to ``reminder_data``'s.
+
+        Each comes with a ``similarity`` column, most similar first.
+        """
+        matches, records = [], []
+        if threshold > 0:
+            with self._lock:
+                index = self._sync()
+                matches = index.find_duplicates(reminder_data, threshold)[:limit]
+                records = [dict(index.rows[key]) for _, key in matches]
+        duplicates = apply_schema(pd.DataFrame(records, columns=COLUMNS))
+        duplicates["similarity"] = pd.Series([similarity for similarity, _ in matches], dtype=float)
+        return duplicates
+
+    def page(self, status=None, category=None, offset=0, limit=None, today=None, query=None):
+        """Return one page of reminders with ``overdue`` and ``upcoming`` columns.
+
+        Reminders are ordered by date, or by relevance when searching for
+        ``query``. With ``today``, pending recurring reminders are listed
+        once per occurrence from their date through the recurrence horizon;
+        ``upcoming`` marks the occurrences after the first one listed.
+        """
+        with self._lock:
+            index = self._sync()
+            if query:
+                stop = None if limit is None else offset + limit
+                records = [index.rows[key] for key in index.search(query, status, category, stop)[offset:]]
+            else:
+                until = self._listing_end(today) if today is not None else None
+                records = index.page(status, category, offset, limit, until)
+            records = [dict(record) for record in records]
+            upcoming = [record.pop("upcoming", False) for record in records]
+        page = apply_schema(pd.DataFrame(records, columns=COLUMNS))
+        page["upcoming"] = upcoming
+        if today is not None:
+            day = today.isoformat()
+            page["overdue"] = [date_key(record["date"]) < day for record in records]
+        return page
+
+
+BACKENDS = {
+    "csv": CSVStore,
+    "sqlite": SQLiteStore,
+    "eventlog": EventLogStore,
+    "parquet": ParquetStore,
+}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(backend=None):
+    """Return the process-wide store for ``backend`` (default: configured).
+
+    The backend is wrapped in an ``IndexedStore`` for Dashboard queries, and
+    status changes go through a ``WriteBehindStore`` unless
+    ``NEVERMISS_WRITE_BEHIND_MS`` is 0.
+    """
+    backend = backend or STORAGE_BACKEND
+    with _stores_lock:
+        if backend not in _stores:
+            try:
+                store = BACKENDS[backend]()
+            except KeyError:
+                raise ValueError(f"Unknown storage backend: {backend!r}") from None
+            if WRITE_BEHIND_SECONDS > 0:
+                store = WriteBehindStore(store)
+            _stores[backend] = IndexedStore(store, path=f"{INDEX_FILE}.{backend}" if INDEX_FILE else None)
+        return _stores[backend]
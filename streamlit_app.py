@@ -1,14 +1,31 @@
 import streamlit as st
+import altair as alt
 import pandas as pd
-import json
 import os
 from datetime import datetime
-from pathlib import Path
-import google.generativeai as genai
+
+import metrics
+import parsing
+import recurrence
+import storage
+import timing
 
 # Configuration
-CSV_FILE = "reminders.csv"
 API_KEY = os.getenv("GEMINI_API_KEY")
+CATEGORIES = storage.CATEGORIES
+PRIORITIES = storage.PRIORITIES
+LOW_CONFIDENCE = 0.6
+PAGE_SIZES = [10, 25, 50, 100]
+PAGE_SIZE = int(os.getenv("NEVERMISS_PAGE_SIZE", 25))
+DEBUG_PANEL = os.getenv("NEVERMISS_DEBUG_PANEL") == "1"
+REPEAT_OPTIONS = {
+    "Does not repeat": None,
+    "Daily": "FREQ=DAILY",
+    "Weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "Weekly": "FREQ=WEEKLY",
+    "Monthly": "FREQ=MONTHLY",
+    "Yearly": "FREQ=YEARLY",
+}
 
 # Initialize Streamlit page config
 st.set_page_config(
@@ -18,91 +35,156 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Time this rerun; spans in the helpers below and in parsing/storage land in it
+st.session_state.timing_trace = timing.start_rerun(st.session_state.get("timing_trace"))
+
 # Initialize session state
-if "reminders" not in st.session_state:
-    st.session_state.reminders = None
 if "parsed_reminder" not in st.session_state:
     st.session_state.parsed_reminder = None
+if "bulk_parsed" not in st.session_state:
+    st.session_state.bulk_parsed = None
+if "duplicate_matches" not in st.session_state:
+    st.session_state.duplicate_matches = None
+if "dashboard_page" not in st.session_state:
+    st.session_state.dashboard_page = 1
 if "api_enabled" not in st.session_state:
-    st.session_state.api_enabled = bool(API_KEY)
+    st.session_state.api_enabled = bool(API_KEY) or not parsing.needs_api_key()
+
+# Export metrics from this server process (started once, on the first rerun)
+if metrics.enabled():
+    try:
+        metrics.start(storage.get_store())
+    except (RuntimeError, OSError) as e:
+        st.warning(f"Metrics are not exported: {e}")
 
 # Configure Gemini API
 if API_KEY:
     try:
-        genai.configure(api_key=API_KEY)
+        parsing.configure(API_KEY)
     except Exception:
         st.session_state.api_enabled = False
 
-def load_reminders():
-    """Load reminders from CSV file."""
-    if Path(CSV_FILE).exists():
-        return pd.read_csv(CSV_FILE)
-    return pd.DataFrame(columns=[
-        "reminder_id", "raw_input", "title", "category",
-        "date", "time", "priority", "notes", "status", "created_at"
-    ])
-
 def save_reminder_to_csv(reminder_data):
-    """Save a single reminder to CSV."""
-    reminders = load_reminders()
-    new_reminder = pd.DataFrame([reminder_data])
-    reminders = pd.concat([reminders, new_reminder], ignore_index=True)
-    reminders.to_csv(CSV_FILE, index=False)
-    st.session_state.reminders = None
+    """Save a single reminder to the configured store and return its ID."""
+    return storage.get_store().save(reminder_data)
 
-def parse_with_gemini(user_input):
-    """Send user input to Gemini for parsing."""
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        prompt = f"""You are a reminder parsing assistant. Extract structured information from the user's input about a reminder or appointment.
+def find_duplicates(reminder_data):
+    """Return pending reminders that look like the same commitment as ``reminder_data``."""
+    return storage.get_store().find_duplicates(reminder_data)
 
-User input: "{user_input}"
+def save_reminders(reminders_data):
+    """Save several reminders to the configured store in one transaction and return their IDs."""
+    return storage.get_store().save_many(reminders_data)
 
-Return ONLY valid JSON (no markdown, no code blocks) with these fields:
-- title: A concise title for the reminder (string)
-- category: One of 'appointment', 'task', 'opportunity', 'follow-up' (string)
-- date: Date in ISO format YYYY-MM-DD if determinable, otherwise null (string or null)
-- time: Time in HH:MM format if mentioned, otherwise null (string or null)
-- priority: One of 'High', 'Medium', 'Low' (string)
-- notes: Any additional details from the input (string)
-- confidence: Confidence score 0-1 that the parsing is correct (number)
+def parse_reminder(user_input):
+    """Parse user input, falling back to Gemini for inputs the local rules can't handle."""
+    try:
+        with timing.span("parse_reminder"):
+            return parsing.parse_reminder(user_input, use_gemini=st.session_state.api_enabled)
+    except Exception as e:
+        st.error(f"Error calling Gemini API: {str(e)}")
+        return None
 
-Handle vague dates intelligently (e.g., "next week" should be estimated from today {datetime.now().strftime('%Y-%m-%d')}).
-If the date cannot be determined at all, set to null.
-Return ONLY the JSON object, nothing else."""
-        
-        response = model.generate_content(prompt)
-        json_text = response.text.strip()
-        
-        # Clean up markdown code blocks if present
-        if json_text.startswith("```"):
-            json_text = json_text.split("```")[1]
-            if json_text.startswith("json"):
-                json_text = json_text[4:]
-            json_text = json_text.strip()
-        
-        parsed = json.loads(json_text)
-        return parsed
+def parse_reminders_bulk(user_inputs):
+    """Parse many inputs at once, batching the ones that need Gemini."""
+    try:
+        return parsing.parse_reminders_bulk(user_inputs, use_gemini=st.session_state.api_enabled)
     except Exception as e:
         st.error(f"Error calling Gemini API: {str(e)}")
         return None
 
-def is_overdue(date_str):
-    """Check if a date is overdue."""
-    if not date_str or date_str == "null" or pd.isna(date_str):
-        return False
+def display_value(value, default):
+    """Return ``value`` as display text, or ``default`` if it is missing."""
+    if value is None or pd.isna(value) or value == "":
+        return default
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+def is_valid_date(value):
+    """Check that ``value`` is an ISO ``YYYY-MM-DD`` date."""
     try:
-        reminder_date = datetime.fromisoformat(str(date_str)).date()
-        return reminder_date < datetime.now().date()
-    except:
+        datetime.strptime(value, "%Y-%m-%d")
+        return True
+    except ValueError:
         return False
 
+def blank_to_none(value):
+    """Return None for empty or missing editor cells."""
+    if value is None or pd.isna(value) or not str(value).strip():
+        return None
+    return value
+
+def normalize_recurrence(value):
+    """Return ``value`` as a canonical recurrence rule, or None if blank.
+
+    Raises ValueError for rules the app can't expand.
+    """
+    value = blank_to_none(value)
+    if value is None:
+        return None
+    return recurrence.format_rule(recurrence.parse_rule(value))
+
+def start_date(day, rule):
+    """Return the date to store: a recurring reminder starts on its first occurrence from ``day`` or today."""
+    if not rule:
+        return day
+    day = day or datetime.now().date().isoformat()
+    first = next(recurrence.occurrences(rule, day), None)
+    return first.isoformat() if first is not None else day
+
 def update_reminder_status(reminder_id, status):
     """Update the status of a reminder."""
-    reminders = load_reminders()
-    reminders.loc[reminders["reminder_id"] == reminder_id, "status"] = status
-    reminders.to_csv(CSV_FILE, index=False)
-    st.session_state.reminders = None
+    storage.get_store().update_status(reminder_id, status)
+
+def complete_reminder(reminder):
+    """Mark a reminder done; a recurring one moves on to its next occurrence instead."""
+    rule = blank_to_none(reminder["recurrence"])
+    if rule and pd.notna(reminder["date"]):
+        next_date = recurrence.next_occurrence(rule, reminder["date"], reminder["date"])
+        if next_date is not None:
+            storage.get_store().update_dates({reminder["reminder_id"]: next_date.isoformat()})
+            return
+    update_reminder_status(reminder["reminder_id"], "completed")
+
+def render_debug_panel(trace):
+    """Show this rerun's spans as a waterfall and recent span durations as histograms."""
+    with st.expander("⏱️ Timings"):
+        elapsed = trace.elapsed_ms()
+        st.caption(f"Rerun #{trace.id}: {elapsed:.1f} ms before this panel")
+        spans = pd.DataFrame(trace.to_dict()["spans"], columns=["name", "start_ms", "duration_ms", "depth"])
+        if len(spans):
+            spans["end_ms"] = spans["start_ms"] + spans["duration_ms"]
+            spans["span"] = ["· " * depth + name for depth, name in zip(spans["depth"], spans["name"])]
+            waterfall = alt.Chart(spans).mark_bar().encode(
+                x=alt.X("start_ms", title="ms since rerun start"),
+                x2="end_ms",
+                y=alt.Y("span", sort=None, title=None),
+                tooltip=["name", alt.Tooltip("start_ms", format=".1f"), alt.Tooltip("duration_ms", format=".1f")],
+            )
+            st.altair_chart(waterfall, use_container_width=True)
+        
+        history = timing.history()
+        if history:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "span": name,
+                        "count": len(durations),
+                        "p50 ms": pd.Series(durations).quantile(0.5),
+                        "p95 ms": pd.Series(durations).quantile(0.95),
+                    }
+                    for name, durations in sorted(history.items())
+                ]),
+                hide_index=True,
+                use_container_width=True
+            )
+            name = st.selectbox("Span", sorted(history), key="timing_span")
+            histogram = alt.Chart(pd.DataFrame({"duration_ms": history[name]})).mark_bar().encode(
+                x=alt.X("duration_ms", bin=alt.Bin(maxbins=30), title="ms"),
+                y=alt.Y("count()", title=f"last {len(history[name])} {name}"),
+            )
+            st.altair_chart(histogram, use_container_width=True)
 
 # Header
 st.title("📋 NeverMiss Lite")
@@ -110,7 +192,7 @@ st.markdown("Turn written commitments into follow-through")
 
 # Check API Key
 if not st.session_state.api_enabled:
-    st.error("🔑 Gemini API key not found. Please set the `GEMINI_API_KEY` environment variable to enable AI features.")
+    st.warning("🔑 Gemini API key not found. Simple reminders are parsed locally; set the `GEMINI_API_KEY` environment variable to enable AI parsing.")
 
 # Main layout with tabs
 tab1, tab2 = st.tabs(["Add Reminder", "Dashboard"])
@@ -123,19 +205,19 @@ with tab1:
         "Describe your reminder or appointment:",
         placeholder="e.g., Doctor appointment next Thursday at 3pm",
         height=100,
-        key="reminder_input",
-        disabled=not st.session_state.api_enabled
+        key="reminder_input"
     )
     
     col1, col2 = st.columns([1, 4])
     with col1:
-        parse_button = st.button("Parse with AI", use_container_width=True, disabled=not st.session_state.api_enabled)
+        parse_button = st.button("Parse", use_container_width=True)
     
     if parse_button and user_input.strip():
-        with st.spinner("Analyzing with Gemini..."):
-            parsed = parse_with_gemini(user_input)
+        with st.spinner("Analyzing..."):
+            parsed = parse_reminder(user_input)
             if parsed:
                 st.session_state.parsed_reminder = parsed
+                st.session_state.duplicate_matches = None
     
     # Display parsed fields if available
     if st.session_state.parsed_reminder:
@@ -145,7 +227,7 @@ with tab1:
         
         # Show confidence if low
         confidence = parsed.get("confidence", 0.8)
-        if confidence < 0.6:
+        if confidence < LOW_CONFIDENCE:
             st.warning(f"⚠️ Low confidence ({confidence:.1%}) in parsing. Please review carefully.")
         
         # Editable fields in columns
@@ -155,8 +237,8 @@ with tab1:
             title = st.text_input("Title", value=parsed.get("title", ""))
             category = st.selectbox(
                 "Category",
-                ["appointment", "task", "opportunity", "follow-up"],
-                index=["appointment", "task", "opportunity", "follow-up"].index(parsed.get("category", "task"))
+                CATEGORIES,
+                index=CATEGORIES.index(parsed.get("category", "task"))
             )
             date = st.text_input(
                 "Date (YYYY-MM-DD)",
@@ -170,8 +252,20 @@ with tab1:
             )
             priority = st.selectbox(
                 "Priority",
-                ["High", "Medium", "Low"],
-                index=["High", "Medium", "Low"].index(parsed.get("priority", "Medium"))
+                PRIORITIES,
+                index=PRIORITIES.index(parsed.get("priority", "Medium"))
+            )
+            try:
+                parsed_rule = normalize_recurrence(parsed.get("recurrence"))
+            except ValueError:
+                parsed_rule = None
+            repeat_options = dict(REPEAT_OPTIONS)
+            if parsed_rule not in repeat_options.values():
+                repeat_options[recurrence.describe(parsed_rule)] = parsed_rule
+            repeat = st.selectbox(
+                "Repeats",
+                list(repeat_options),
+                index=list(repeat_options.values()).index(parsed_rule)
             )
         
         notes = st.text_area(
@@ -180,106 +274,260 @@ with tab1:
             height=80
         )
         
-        # Save button
-        if st.button("Save Reminder", use_container_width=True, type="primary"):
+        # Save button; a likely duplicate needs a second confirmation
+        save_clicked = st.button("Save Reminder", use_container_width=True, type="primary")
+        save_anyway = False
+        duplicates = st.session_state.duplicate_matches
+        if duplicates is not None:
+            matches = "\n".join(
+                f"- **{row['title']}** ({display_value(row['date'], 'no date')}, {row['similarity']:.0%} similar)"
+                for _, row in duplicates.iterrows()
+            )
+            st.warning(f"⚠️ This looks like a reminder you already have:\n{matches}")
+            save_anyway = st.button("Save anyway", use_container_width=True)
+        
+        if save_clicked or save_anyway:
             if not title.strip():
                 st.error("Title is required.")
+            elif date.strip() and not is_valid_date(date.strip()):
+                st.error("Date must be in YYYY-MM-DD format.")
             else:
-                # Generate ID
-                reminders = load_reminders()
-                reminder_id = len(reminders) + 1
-                
+                # The store allocates the reminder ID
+                rule = repeat_options[repeat]
                 reminder_data = {
-                    "reminder_id": reminder_id,
                     "raw_input": user_input,
                     "title": title,
                     "category": category,
-                    "date": date if date.strip() else None,
+                    "date": start_date(date.strip() or None, rule),
                     "time": time if time.strip() else None,
+                    "recurrence": rule,
                     "priority": priority,
+                    "notes": blank_to_none(notes),
                     "status": "pending",
                     "created_at": datetime.now().isoformat()
                 }
                 
+                duplicates = None if save_anyway else find_duplicates(reminder_data)
+                if duplicates is not None and len(duplicates):
+                    st.session_state.duplicate_matches = duplicates
+                    st.rerun()
+                
                 save_reminder_to_csv(reminder_data)
                 st.success("✅ Reminder saved!")
                 st.session_state.parsed_reminder = None
-                st.session_state.reminders = None
+                st.session_state.duplicate_matches = None
                 st.rerun()
 
+    # Bulk import
+    with st.expander("📥 Bulk import"):
+        bulk_input = st.text_area(
+            "Paste one reminder per line:",
+            placeholder="- Send contract to Sam by Friday\n- Dentist 2026-11-03 at 9am\n- Renew passport next month",
+            height=200,
+            key="bulk_input"
+        )
+        
+        if st.button("Parse all", use_container_width=True) and bulk_input.strip():
+            items = parsing.split_bulk_input(bulk_input)
+            with st.spinner(f"Analyzing {len(items)} reminders..."):
+                parsed_items = parse_reminders_bulk(items)
+            if parsed_items:
+                rows = []
+                for raw_input, item in zip(items, parsed_items):
+                    confidence = float(item.get("confidence") or 0)
+                    rows.append({
+                        "review": confidence < LOW_CONFIDENCE,
+                        "raw_input": raw_input,
+                        "title": item.get("title") or "",
+                        "category": item.get("category") if item.get("category") in CATEGORIES else "task",
+                        "date": item.get("date"),
+                        "time": item.get("time"),
+                        "recurrence": item.get("recurrence") or "",
+                        "priority": item.get("priority") if item.get("priority") in PRIORITIES else "Medium",
+                        "notes": item.get("notes") or "",
+                        "confidence": confidence,
+                    })
+                st.session_state.bulk_parsed = pd.DataFrame(rows)
+        
+        if st.session_state.bulk_parsed is not None:
+            bulk = st.data_editor(
+                st.session_state.bulk_parsed,
+                hide_index=True,
+                use_container_width=True,
+                key="bulk_editor",
+                column_config={
+                    "review": st.column_config.CheckboxColumn("⚠️ Review", disabled=True),
+                    "raw_input": st.column_config.TextColumn("Input", disabled=True),
+                    "category": st.column_config.SelectboxColumn("Category", options=CATEGORIES),
+                    "recurrence": st.column_config.TextColumn("Repeats", help="Rule such as FREQ=WEEKLY;BYDAY=MO"),
+                    "priority": st.column_config.SelectboxColumn("Priority", options=PRIORITIES),
+                    "confidence": st.column_config.ProgressColumn("Confidence", min_value=0, max_value=1),
+                }
+            )
+            flagged = int(bulk["review"].sum())
+            if flagged:
+                st.warning(f"⚠️ {flagged} of {len(bulk)} reminders have low confidence. Please review them before saving.")
+            
+            if st.button(f"Save all {len(bulk)} reminders", use_container_width=True, type="primary"):
+                bulk = bulk[bulk["title"].fillna("").str.strip() != ""]
+                bad_dates = [
+                    value for value in bulk["date"]
+                    if blank_to_none(value) and not is_valid_date(str(value).strip())
+                ]
+                bad_rules = []
+                for value in bulk["recurrence"]:
+                    try:
+                        normalize_recurrence(value)
+                    except ValueError:
+                        bad_rules.append(value)
+                if bad_dates:
+                    st.error(f"Dates must be in YYYY-MM-DD format: {', '.join(map(str, bad_dates))}")
+                elif bad_rules:
+                    st.error(f"Unsupported repeat rules: {', '.join(map(str, bad_rules))}")
+                else:
+                    created_at = datetime.now().isoformat()
+                    reminders_data = [
+                        {
+                            "raw_input": row["raw_input"],
+                            "title": row["title"],
+                            "category": row["category"],
+                            "date": start_date(blank_to_none(row["date"]), normalize_recurrence(row["recurrence"])),
+                            "time": blank_to_none(row["time"]),
+                            "recurrence": normalize_recurrence(row["recurrence"]),
+                            "priority": row["priority"],
+                            "notes": blank_to_none(row["notes"]),
+                            "status": "pending",
+                            "created_at": created_at
+                        }
+                        for row in bulk.to_dict("records")
+                    ]
+                    save_reminders(reminders_data)
+                    st.session_state.bulk_parsed = None
+                    st.rerun()
+
 with tab2:
     st.markdown("### 📊 Your Reminders")
     
-    reminders = load_reminders()
+    # Lists and counts come from the store's date/status/category indexes,
+    # so only the visible page is ever materialized.
+    store = storage.get_store()
+    today = datetime.now().date()
     
-    if reminders.empty:
+    if store.count() == 0:
         st.info("No reminders yet. Create one in the 'Add Reminder' tab.")
     else:
-        # Sort by date
-        reminders_sorted = reminders.copy()
-        reminders_sorted["date_sort"] = pd.to_datetime(
-            reminders_sorted["date"], errors="coerce"
-        )
-        reminders_sorted = reminders_sorted.sort_values(
-            "date_sort", na_position="last"
-        ).drop("date_sort", axis=1)
+        search_query = st.text_input(
+            "Search",
+            placeholder="Search titles, notes and original text",
+            key="dashboard_search"
+        ).strip()
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            category_choice = st.selectbox("Category", ["All"] + CATEGORIES, key="dashboard_category")
+        with col2:
+            hide_completed = st.toggle("Hide completed", key="hide_completed")
+        status_filter = "pending" if hide_completed else None
+        category_filter = None if category_choice == "All" else category_choice
+        with timing.span("dashboard_count"):
+            matching = store.count(status_filter, category_filter, query=search_query, today=today)
+        
+        # Paginate so only the visible slice is turned into widgets
+        page_sizes = sorted(set(PAGE_SIZES + [PAGE_SIZE]))
+        col1, col2, col3 = st.columns([1, 1, 3])
+        with col1:
+            page_size = st.selectbox(
+                "Per page",
+                page_sizes,
+                index=page_sizes.index(PAGE_SIZE),
+                key="dashboard_page_size"
+            )
+        page_count = max(1, -(-matching // page_size))
+        st.session_state.dashboard_page = min(st.session_state.dashboard_page, page_count)
+        with col2:
+            page = st.number_input(
+                "Page",
+                min_value=1,
+                max_value=page_count,
+                step=1,
+                key="dashboard_page"
+            )
+        start = (page - 1) * page_size
+        with timing.span("dashboard_page"):
+            page_reminders = store.page(status_filter, category_filter, start, page_size, today=today, query=search_query)
+        with col3:
+            if matching:
+                st.caption(f"Showing {start + 1}–{start + len(page_reminders)} of {matching} reminders")
+            else:
+                st.caption("No reminders match these filters.")
         
         # Display reminders
-        for idx, reminder in reminders_sorted.iterrows():
-            is_overdue_flag = is_overdue(reminder["date"])
-            is_completed = reminder["status"] == "completed"
+        with timing.span("dashboard_render"):
+            for idx, reminder in page_reminders.iterrows():
+                is_overdue_flag = reminder["overdue"]
+                is_completed = reminder["status"] == "completed"
             
-            # Color-code based on status
-            if is_completed:
-                st.markdown("---")
-                col1, col2, col3 = st.columns([3, 1, 1])
-                with col1:
-                    st.markdown(f"✓ ~~{reminder['title']}~~ (Completed)")
-                with col3:
-                    if st.button("Undo", key=f"undo_{reminder['reminder_id']}"):
-                        update_reminder_status(reminder["reminder_id"], "pending")
-                        st.rerun()
-            else:
-                if is_overdue_flag:
-                    st.markdown(f"### 🔴 {reminder['title']} (OVERDUE)")
+                # Color-code based on status
+                if is_completed:
+                    st.markdown("---")
+                    col1, col2, col3 = st.columns([3, 1, 1])
+                    with col1:
+                        st.markdown(f"✓ ~~{reminder['title']}~~ (Completed)")
+                    with col3:
+                        if st.button("Undo", key=f"undo_{reminder['reminder_id']}"):
+                            update_reminder_status(reminder["reminder_id"], "pending")
+                            st.rerun()
                 else:
-                    st.markdown(f"### {reminder['title']}")
+                    if is_overdue_flag:
+                        st.markdown(f"### 🔴 {reminder['title']} (OVERDUE)")
+                    else:
+                        st.markdown(f"### {reminder['title']}")
                 
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.text(f"📅 {reminder['date'] or 'No date'}")
-                with col2:
-                    st.text(f"🕐 {reminder['time'] or 'No time'}")
-                with col3:
-                    priority_emoji = {"High": "🔴", "Medium": "🟡", "Low": "🟢"}.get(reminder["priority"], "⚪")
-                    st.text(f"{priority_emoji} {reminder['priority']}")
-                with col4:
-                    st.text(f"📂 {reminder['category']}")
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.text(f"📅 {display_value(reminder['date'], 'No date')}")
+                    with col2:
+                        st.text(f"🕐 {display_value(reminder['time'], 'No time')}")
+                    with col3:
+                        priority_emoji = {"High": "🔴", "Medium": "🟡", "Low": "🟢"}.get(reminder["priority"], "⚪")
+                        st.text(f"{priority_emoji} {reminder['priority']}")
+                    with col4:
+                        st.text(f"📂 {reminder['category']}")
                 
-                if "notes" in reminder and pd.notna(reminder["notes"]) and reminder["notes"]:
-                    st.markdown(f"**Notes:** {reminder['notes']}")
+                    if pd.notna(reminder["recurrence"]) and reminder["recurrence"]:
+                        try:
+                            st.caption(f"🔁 {recurrence.describe(reminder['recurrence'])}")
+                        except ValueError:
+                            st.caption(f"🔁 {reminder['recurrence']}")
                 
-                st.markdown(f"*Created: {reminder['created_at'][:10]}*")
+                    if "notes" in reminder and pd.notna(reminder["notes"]) and reminder["notes"]:
+                        st.markdown(f"**Notes:** {reminder['notes']}")
                 
-                # Mark as completed button
-                if st.button("Mark as Completed", key=f"complete_{reminder['reminder_id']}"):
-                    update_reminder_status(reminder["reminder_id"], "pending" if is_completed else "completed")
-                    st.rerun()
+                    st.markdown(f"*Created: {display_value(reminder['created_at'], 'unknown')}*")
                 
-                st.markdown("---")
+                    # Mark as completed button; a recurring reminder is done
+                    # one occurrence at a time, starting with the stored one
+                    if reminder["upcoming"]:
+                        st.caption("Upcoming occurrence")
+                    elif st.button("Mark as Completed", key=f"complete_{reminder['reminder_id']}"):
+                        complete_reminder(reminder)
+                        st.rerun()
+                
+                    st.markdown("---")
         
-        # Summary stats
+        # Summary stats, read from counters the store keeps up to date
+        with timing.span("dashboard_summary"):
+            summary = store.summary(today)
         st.markdown("### 📈 Summary")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Reminders", len(reminders))
+            st.metric("Total Reminders", summary["total"])
         with col2:
-            st.metric("Pending", len(reminders[reminders["status"] == "pending"]))
+            st.metric("Pending", summary["pending"])
         with col3:
-            st.metric("Completed", len(reminders[reminders["status"] == "completed"]))
+            st.metric("Completed", summary["completed"])
         with col4:
-            overdue_count = sum(
-                is_overdue(date) and status == "pending"
-                for date, status in zip(reminders["date"], reminders["status"])
-            )
-            st.metric("Overdue", overdue_count)
+            st.metric("Overdue", summary["overdue"])
+
+if DEBUG_PANEL or st.query_params.get("debug") == "1":
+    render_debug_panel(st.session_state.timing_trace)
+timing.finish_rerun(st.session_state.timing_trace)
@@ -0,0 +1,73 @@
+import unittest
+
+from indexes import ReminderIndex
+
+
+def reminder(reminder_id, title, day, rule=None, status="pending"):
+    return {"reminder_id": reminder_id, "raw_input": title.lower(), "title": title, "category": "task",
+            "date": day, "time": None, "recurrence": rule, "priority": "medium", "notes": None,
+            "status": status, "created_at": "2026-10-01T09:00:00"}
+
+
+def listing(records):
+    return [(record["title"], record["date"], record.get("upcoming", False)) for record in records]
+
+
+class PageTest(unittest.TestCase):
+    def test_recurring_reminder_listed_per_occurrence(self):
+        index = ReminderIndex.build([
+            reminder(1, "Standup", "2026-10-19", "FREQ=WEEKLY;BYDAY=MO,WE"),
+            reminder(2, "Dentist", "2026-10-20"),
+        ])
+        self.assertEqual(listing(index.page("pending", until="2026-10-28")), [
+            ("Standup", "2026-10-19", False),
+            ("Dentist", "2026-10-20", False),
+            ("Standup", "2026-10-21", True),
+            ("Standup", "2026-10-26", True),
+            ("Standup", "2026-10-28", True),
+        ])
+        self.assertEqual(index.count_listed("pending", until="2026-10-28"), 5)
+
+    def test_first_occurrence_after_stored_date_can_be_completed(self):
+        # Stored on a Saturday, so its first occurrence is the Monday after.
+        index = ReminderIndex.build([reminder(1, "Weekdays", "2026-10-17", "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR")])
+        self.assertEqual(listing(index.page(until="2026-10-20")), [
+            ("Weekdays", "2026-10-19", False),
+            ("Weekdays", "2026-10-20", True),
+        ])
+
+    def test_later_pages_keep_occurrences_upcoming(self):
+        index = ReminderIndex.build([reminder(1, "Water plants", "2026-10-15", "FREQ=DAILY")])
+        self.assertEqual(listing(index.page(offset=2, limit=2, until="2026-10-20")), [
+            ("Water plants", "2026-10-17", True),
+            ("Water plants", "2026-10-18", True),
+        ])
+
+    def test_rows_sharing_an_id_are_not_upcoming(self):
+        index = ReminderIndex.build([
+            reminder(3, "Pay rent", "2026-10-20"),
+            reminder(3, "Pay rent again", None),
+        ])
+        self.assertEqual(listing(index.page(until="2026-10-31")), [
+            ("Pay rent", "2026-10-20", False),
+            ("Pay rent again", None, False),
+        ])
+
+    def test_rule_without_occurrences_is_listed_once(self):
+        index = ReminderIndex.build([reminder(1, "Expired", "2026-10-01", "FREQ=DAILY;UNTIL=20260901")])
+        self.assertEqual(listing(index.page(until="2026-10-31")), [("Expired", "2026-10-01", False)])
+
+    def test_completed_recurring_reminder_listed_once(self):
+        index = ReminderIndex.build([reminder(1, "Gym", "2026-10-15", "FREQ=DAILY", status="completed")])
+        self.assertEqual(listing(index.page(until="2026-10-31")), [("Gym", "2026-10-15", False)])
+
+    def test_page_without_horizon_lists_stored_rows(self):
+        index = ReminderIndex.build([
+            reminder(1, "Gym", "2026-10-15", "FREQ=DAILY"),
+            reminder(2, "Dentist", "2026-10-14"),
+        ])
+        self.assertEqual(listing(index.page()), [("Dentist", "2026-10-14", False), ("Gym", "2026-10-15", False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from datetime import date
+
+import local_parser
+import parsing
+
+# A Thursday
+TODAY = date(2026, 10, 15)
+
+
+class ParseLocallyTest(unittest.TestCase):
+    def test_parses(self):
+        cases = [
+            # input, title, date, time, recurrence
+            ("call mom friday 5pm", "Call mom", "2026-10-16", "17:00", None),
+            ("pay rent 2026-11-01", "Pay rent", "2026-11-01", None, None),
+            ("dentist tomorrow at 9:30", "Dentist", "2026-10-16", "09:30", None),
+            ("water plants every monday", "Water plants", "2026-10-19", None, "FREQ=WEEKLY;BYDAY=MO"),
+            ("standup every mon and wed", "Standup", "2026-10-19", None, "FREQ=WEEKLY;BYDAY=MO,WE"),
+            ("call Sam on fri", "Call Sam", "2026-10-16", None, None),
+            ("review next tue", "Review", "2026-10-27", None, None),
+            ("gym mon 7am", "Gym", "2026-10-19", "07:00", None),
+            ("gym 7am mon", "Gym", "2026-10-19", "07:00", None),
+            ("call Sam sat at 10", "Call Sam", "2026-10-17", "10:00", None),
+            ("sun screen", "Sun screen", None, None, None),
+            ("sat exam prep", "Sat exam prep", None, None, None),
+            ("buy wed cake", "Buy wed cake", None, None, None),
+        ]
+        for text, title, day, time, rule in cases:
+            with self.subTest(text=text):
+                parsed = local_parser.parse_locally(text, TODAY)
+                self.assertEqual(
+                    (parsed["title"], parsed["date"], parsed["time"], parsed["recurrence"]),
+                    (title, day, time, rule),
+                )
+
+    def test_confidence(self):
+        threshold = parsing.LOCAL_PARSE_THRESHOLD
+        cases = [
+            # input, whether the local parse is confident enough to skip Gemini
+            ("call mom friday 5pm", True),
+            ("gym mon 7am", True),
+            ("call Sam on fri", True),
+            ("sun screen", False),
+            ("sat exam prep", False),
+            ("gym mon wed fri 7am", False),
+            ("gym mon wed fri", False),
+            ("lunch with Sam next week", False),
+        ]
+        for text, confident in cases:
+            with self.subTest(text=text):
+                parsed = local_parser.parse_locally(text, TODAY)
+                self.assertEqual(parsed["confidence"] >= threshold, confident, parsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import json
+import unittest
+from datetime import date
+
+import mock_gemini
+import parsing
+
+TODAY = date(2026, 10, 15)
+INPUTS = ["call mom friday 5pm", "call mom\nfriday 5pm", 'say "hi" to Sam tomorrow', "café at 9am"]
+
+
+class PromptInputsTest(unittest.TestCase):
+    def test_single_prompt(self):
+        for text in INPUTS:
+            with self.subTest(text=text):
+                self.assertEqual(mock_gemini.prompt_inputs(parsing.build_prompt(text, TODAY)), ([text], False))
+
+    def test_batch_prompt(self):
+        self.assertEqual(mock_gemini.prompt_inputs(parsing.build_batch_prompt(INPUTS, TODAY)), (INPUTS, True))
+
+    def test_model_answers_multi_line_input(self):
+        model = mock_gemini.MockGeminiModel(recordings={}, latency=0, jitter=0, fence_rate=0)
+        response = model.generate_content(parsing.build_prompt("call mom\nfriday 5pm", TODAY))
+        self.assertEqual(json.loads(response.text)["date"], "2026-10-16")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from datetime import date
+
+import recurrence
+
+
+class ParseRuleTest(unittest.TestCase):
+    def test_round_trip(self):
+        for text in ["FREQ=DAILY", "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH", "FREQ=MONTHLY;BYMONTHDAY=-1",
+                     "FREQ=YEARLY;UNTIL=20301231"]:
+            self.assertEqual(recurrence.format_rule(recurrence.parse_rule(text)), text)
+
+    def test_invalid_rules(self):
+        for text in ["", "FREQ=HOURLY", "FREQ=DAILY;INTERVAL=0", "FREQ=DAILY;BYDAY=MO",
+                     "FREQ=MONTHLY;BYMONTHDAY=32", "FREQ=WEEKLY;BYDAY=XX", "FREQ=DAILY;COUNT=3"]:
+            with self.assertRaises(ValueError, msg=text):
+                recurrence.parse_rule(text)
+
+
+class OccurrencesTest(unittest.TestCase):
+    def first(self, rule, start, count):
+        occurrences = recurrence.occurrences(rule, start)
+        return [next(occurrences).isoformat() for _ in range(count)]
+
+    def test_rules(self):
+        cases = [
+            ("FREQ=DAILY", "2026-10-30", ["2026-10-30", "2026-10-31", "2026-11-01"]),
+            ("FREQ=WEEKLY", "2026-10-15", ["2026-10-15", "2026-10-22", "2026-10-29"]),
+            ("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH", "2026-10-15", ["2026-10-15", "2026-10-26", "2026-10-29"]),
+            ("FREQ=MONTHLY", "2026-01-31", ["2026-01-31", "2026-03-31", "2026-05-31"]),
+            ("FREQ=MONTHLY;BYMONTHDAY=-1", "2026-01-15", ["2026-01-31", "2026-02-28", "2026-03-31"]),
+            ("FREQ=YEARLY", "2024-02-29", ["2024-02-29", "2028-02-29", "2032-02-29"]),
+        ]
+        for rule, start, expected in cases:
+            with self.subTest(rule=rule, start=start):
+                self.assertEqual(self.first(rule, start, 3), expected)
+
+    def test_start_off_the_rule(self):
+        # Weekdays from a Saturday start on the Monday after.
+        self.assertEqual(self.first("FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR", "2026-10-17", 2),
+                         ["2026-10-19", "2026-10-20"])
+
+    def test_until(self):
+        days = list(recurrence.occurrences("FREQ=DAILY;UNTIL=20261017", "2026-10-15"))
+        self.assertEqual(days, [date(2026, 10, 15), date(2026, 10, 16), date(2026, 10, 17)])
+        self.assertEqual(list(recurrence.occurrences("FREQ=DAILY;UNTIL=20261001", "2026-10-15")), [])
+
+    def test_rule_that_never_matches(self):
+        self.assertEqual(list(recurrence.occurrences("FREQ=MONTHLY;INTERVAL=12;BYMONTHDAY=31", "2026-02-01")), [])
+
+    def test_between_and_next(self):
+        rule = recurrence.parse_rule("FREQ=WEEKLY;BYDAY=MO")
+        self.assertEqual(list(recurrence.occurrences_between(rule, "2026-10-05", "2026-10-10", "2026-10-26")),
+                         [date(2026, 10, 12), date(2026, 10, 19), date(2026, 10, 26)])
+        self.assertEqual(recurrence.next_occurrence(rule, "2026-10-05", "2026-10-12"), date(2026, 10, 19))
+        self.assertIsNone(recurrence.next_occurrence("FREQ=DAILY;UNTIL=20261010", "2026-10-05", "2026-10-10"))
+
+    def test_describe(self):
+        self.assertEqual(recurrence.describe("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH"), "Every 2 weeks on Mon, Thu")
+        self.assertEqual(recurrence.describe("FREQ=MONTHLY;BYMONTHDAY=-1"), "Monthly on the last day")
+
+
+if __name__ == "__main__":
+    unittest.main()
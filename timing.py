@@ -0,0 +1,143 @@
+"""Lightweight timing spans for finding where a rerun spends its time.
+
+``with span("store_load"):`` times a block. Spans opened on a thread
+with an active rerun trace (see ``start_rerun``) are collected into it with
+their start offset and nesting depth, for the debug panel's waterfall.
+Every span's duration also goes into a rolling per-name history, for
+histograms, and to any listeners, such as the metrics exporter. Finished
+traces, and spans timed outside any rerun (such as Gemini calls on a
+bulk-parse worker thread), are appended as JSON lines to
+``NEVERMISS_TIMING_LOG`` when it is set.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+TIMING_LOG = os.getenv("NEVERMISS_TIMING_LOG")
+HISTORY_SIZE = int(os.getenv("NEVERMISS_TIMING_HISTORY", 500))
+
+_local = threading.local()
+_history = {}
+_history_lock = threading.Lock()
+_log_lock = threading.Lock()
+_rerun_ids = itertools.count(1)
+_listeners = []
+
+
+class Trace:
+    """The spans timed during one rerun, offsets relative to its start."""
+
+    def __init__(self):
+        self.id = next(_rerun_ids)
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.started = time.perf_counter()
+        self.spans = []
+        self.depth = 0
+        self.duration_ms = None
+        self.interrupted = False
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_dict(self):
+        return {
+            "rerun": self.id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "interrupted": self.interrupted,
+            "spans": sorted(self.spans, key=lambda item: item["start_ms"]),
+        }
+
+
+def start_rerun(previous=None):
+    """Start a trace for the rerun on this thread and return it.
+
+    ``previous`` is the session's last trace; if it never finished (the
+    script was stopped early, say by ``st.rerun()``) it is finished now.
+    """
+    if previous is not None and previous.duration_ms is None:
+        finish_rerun(previous, interrupted=True)
+    trace = Trace()
+    _local.trace = trace
+    return trace
+
+
+def finish_rerun(trace, interrupted=False):
+    """Close ``trace``, add its duration to the history and export it."""
+    if trace.duration_ms is not None:
+        return
+    trace.duration_ms = trace.elapsed_ms()
+    trace.interrupted = interrupted
+    if getattr(_local, "trace", None) is trace:
+        _local.trace = None
+    record("rerun", trace.duration_ms)
+    export(trace.to_dict())
+
+
+@contextmanager
+def span(name):
+    """Time the block as ``name``, within the current rerun if there is one."""
+    trace = getattr(_local, "trace", None)
+    depth = 0
+    if trace is not None:
+        depth = trace.depth
+        trace.depth += 1
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        # Not BaseException: Streamlit stops and reruns scripts with those.
+        failed = True
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        record(name, duration_ms, failed)
+        if trace is not None:
+            trace.depth -= 1
+            trace.spans.append({
+                "name": name,
+                "start_ms": (started - trace.started) * 1000,
+                "duration_ms": duration_ms,
+                "depth": depth,
+                "failed": failed,
+            })
+        else:
+            export({"rerun": None, "name": name, "ended_at": datetime.now().isoformat(timespec="milliseconds"),
+                    "duration_ms": duration_ms, "failed": failed})
+
+
+def record(name, duration_ms, failed=False):
+    """Add one duration to the rolling history of ``name`` and pass it to the listeners."""
+    with _history_lock:
+        if name not in _history:
+            _history[name] = deque(maxlen=HISTORY_SIZE)
+        _history[name].append(duration_ms)
+    for listener in _listeners:
+        listener(name, duration_ms, failed)
+
+
+def add_listener(listener):
+    """Call ``listener(name, duration_ms, failed)`` for every duration recorded from now on."""
+    _listeners.append(listener)
+
+
+def history():
+    """Return the recent durations of each span name, in milliseconds."""
+    with _history_lock:
+        return {name: list(durations) for name, durations in _history.items()}
+
+
+def export(entry, path=None):
+    """Append ``entry`` as a JSON line to ``path`` (default ``NEVERMISS_TIMING_LOG``), if set."""
+    path = path or TIMING_LOG
+    if not path:
+        return
+    line = json.dumps(entry) + "\n"
+    with _log_lock, open(path, "a") as handle:
+        handle.write(line)